@@ -7,6 +7,7 @@ Servidor Flask que integra el backend Python con el frontend React.
 Optimizado con estructuras de datos avanzadas para máximo rendimiento.
 """
 
+import logging
 import sys
 import os
 
@@ -15,6 +16,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from api.routes import app
 
+# Solo advertencias y errores: los tracebacks se formatean únicamente al registrarse
+logging.basicConfig(level=logging.WARNING)
+
 if __name__ == '__main__':
     print("🚀 Iniciando Sistema de Biblioteca Completo...")
     print("📊 Backend: Python + Flask + Estructuras de Datos Avanzadas")
@@ -26,4 +30,7 @@ if __name__ == '__main__':
     print("💡 Documentación técnica incluida en comentarios del código")
     print("=" * 60)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Modo debug solo si se pide explícitamente (FLASK_DEBUG=1); en producción
+    # usar wsgi.py detrás de gunicorn
+    app.run(host='0.0.0.0', port=5000, threaded=True,
+            debug=os.environ.get('FLASK_DEBUG') == '1')
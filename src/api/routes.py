@@ -3,91 +3,271 @@ API REST para el Sistema de Biblioteca
 =====================================
 
 Endpoints optimizados con estructuras de datos eficientes:
-- Búsquedas O(log n) usando árboles binarios
+- Búsquedas puntuales O(1) en tablas hash; listados y rankings con árboles binarios
 - Operaciones CRUD optimizadas
 - Respuestas JSON estructuradas
 - Manejo robusto de errores con respuestas JSON válidas
 """
 
-from flask import Flask, jsonify, request
-from flask_cors import CORS
+from flask import Flask, request
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
 from src.services.library_service import LibraryService
-import traceback
+import hashlib
+from datetime import date
+import logging
+import os
+import queue
+import threading
+import orjson
+
+# Logger del módulo: el formateo del traceback solo ocurre si hay un handler activo
+logger = logging.getLogger(__name__)
+
+# Cola de excepciones: los tracebacks se formatean en un hilo de fondo,
+# fuera del hilo que atiende la request
+_error_queue = queue.SimpleQueue()
+
+def _error_logger():
+    """Hilo de fondo: registrar las excepciones encoladas por handle_exception"""
+    while True:
+        exc_info, method, path = _error_queue.get()
+        logger.error("Error al procesar %s %s", method, path, exc_info=exc_info)
+
+threading.Thread(target=_error_logger, name='error-logger', daemon=True).start()
 
 # Crear aplicación Flask
 app = Flask(__name__)
-CORS(app)  # Permitir requests desde el frontend
+
+# Headers fijos (JSON + CORS para cualquier origen): se aplican tal cual a
+# cada respuesta sin reconstruirlos ni evaluar el origen por request
+# Las respuestas sin cuerpo (204, 304) reciben solo los headers CORS
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
+}
+RESPONSE_HEADERS = {'Content-Type': 'application/json', **CORS_HEADERS}
+BODYLESS_STATUSES = frozenset((204, 304))
 
 # Instancia global del servicio
 library_service = LibraryService()
 
+# Caché de respuestas GET ya serializadas: ruta completa -> (versión, payload, etag)
+# Se invalida sola al cambiar library_service.version
+_response_cache = {}
+_RESPONSE_CACHE_MAX = 256
+
 # ==================== UTILIDADES ====================
 
+def _json_default(obj):
+    """
+    Serializar objetos de dominio (Book, User) mediante su to_dict()
+    Fechas en formato HTTP-date, igual que el proveedor JSON por defecto de Flask
+    """
+    if isinstance(obj, date):
+        return http_date(obj)
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+    return to_dict()
+
+def dumps(payload):
+    """Serializar a bytes JSON con orjson (acepta Book/User directamente)"""
+    return orjson.dumps(payload, default=_json_default,
+                        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+class OrjsonProvider(JSONProvider):
+    """
+    Proveedor JSON de la aplicación basado en orjson
+    jsonify, request.get_json() y los handlers de Flask usan el mismo
+    serializador rápido que las respuestas propias de la API
+    """
+    
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype='application/json')
+
+app.json = OrjsonProvider(app)
+
+def json_response(payload, status_code=200):
+    """
+    Construir respuesta HTTP a partir de un objeto serializable
+    orjson genera bytes directamente (sin pasar por str ni json estándar)
+    """
+    return app.response_class(dumps(payload), status=status_code,
+                              mimetype='application/json')
+
 def success_response(data, message="Operación exitosa"):
     """
-    Respuesta exitosa estándar - GARANTIZA JSON válido SIEMPRE
+    Respuesta exitosa estándar
+    Un fallo al serializar llega al manejador global de errores 500
     """
-    try:
-        response_data = {
-            'success': True,
-            'message': str(message) if message else "Operación exitosa",
-            'data': data if data is not None else {}
-        }
-        return jsonify(response_data), 200
-    except Exception as e:
-        # Fallback si hay error en jsonify
-        fallback_response = {
-            'success': True,
-            'message': "Operación exitosa",
-            'data': {}
-        }
-        return jsonify(fallback_response), 200
+    return json_response({
+        'success': True,
+        'message': message or "Operación exitosa",
+        'data': data if data is not None else {}
+    }, 200)
 
 def error_response(message, status_code=400):
     """
-    Respuesta de error estándar - GARANTIZA JSON válido SIEMPRE
-    """
-    try:
-        response_data = {
-            'success': False,
-            'message': str(message) if message else "Error desconocido",
-            'data': None
-        }
-        return jsonify(response_data), status_code
-    except Exception as e:
-        # Fallback crítico - NUNCA debe fallar
-        fallback_response = {
-            'success': False,
-            'message': "Error interno del servidor",
-            'data': None
-        }
-        return jsonify(fallback_response), 500
+    Respuesta de error estándar
+    Los mensajes fijos más comunes usan bytes ya serializados
+    """
+    payload = _ERROR_PAYLOADS.get(message)
+    if payload is not None:
+        return app.response_class(payload, status=status_code,
+                                  mimetype='application/json')
+    return json_response({
+        'success': False,
+        'message': message or "Error desconocido",
+        'data': None
+    }, status_code)
+
+def cached_response(build, daily=False):
+    """
+    Servir una respuesta GET desde caché mientras los datos no cambien
+    build() retorna (data, message) y solo se ejecuta si cambió la versión
+    daily=True: el contenido depende también de la fecha actual (puntaje de
+    actividad con bonus por recencia), así que la entrada caduca cada día
+    Responde 304 si el cliente envía un If-None-Match con el ETag vigente
+    Complejidad: O(1) en aciertos de caché - sin recorridos ni serialización
+    """
+    key = request.full_path
+    version = library_service.version
+    if daily:
+        version = (version, date.today())
+    cached = _response_cache.get(key)
+    
+    if cached is None or cached[0] != version:
+        data, message = build()
+        payload = dumps({
+            'success': True,
+            'message': message,
+            'data': data if data is not None else {}
+        })
+        etag = hashlib.blake2b(payload, digest_size=8).hexdigest()
+        cached = (version, payload, etag)
+        
+        if len(_response_cache) >= _RESPONSE_CACHE_MAX:
+            _response_cache.clear()
+        _response_cache[key] = cached
+    
+    _, payload, etag = cached
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(payload, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+# Enteros precalculados para el parámetro 'limit': evita int() en el caso común
+SMALL_INTS = {str(i): i for i in range(1, 1001)}
+
+def parse_limit(default):
+    """Leer el parámetro 'limit' de la query (tabla para enteros pequeños)"""
+    value = request.args.get('limit')
+    if value is None:
+        return default
+    limit = SMALL_INTS.get(value)
+    return limit if limit is not None else int(value)
 
 def handle_exception(e):
     """
     Manejo centralizado de excepciones - GARANTIZA respuesta JSON SIEMPRE
     """
-    try:
-        print(f"Error: {str(e)}")
-        print(traceback.format_exc())
-    except:
-        pass  # No fallar si el logging falla
+    _error_queue.put(((type(e), e, e.__traceback__), request.method, request.path))
     return error_response("Error interno del servidor", 500)
 
 def validate_json_request():
     """
     Validar que la request tenga JSON válido - GARANTIZA respuesta JSON
+    Lee el body crudo una vez y lo decodifica con orjson
     """
+    raw = request.get_data(cache=True)
+    if not raw:
+        return error_response("Body JSON requerido", 400), None
     try:
-        if not request.is_json:
-            return error_response("Content-Type debe ser application/json", 400), None
-        
-        data = request.get_json()
-        if data is None:
-            return error_response("Body JSON requerido", 400), None
-        return None, data
-    except Exception as e:
-        return error_response(f"JSON inválido: {str(e)}", 400), None
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
+        return error_response(f"JSON inválido: {e}", 400), None
+    if data is None:
+        return error_response("Body JSON requerido", 400), None
+    return None, data
+
+# Esquemas de entrada por endpoint: (campo, tipo, valor por defecto)
+# Un valor por defecto None indica campo requerido
+BOOK_SCHEMA = (
+    ('isbn', str, None),
+    ('title', str, None),
+    ('author', str, None),
+    ('year', int, None),
+    ('copies', int, 1),
+)
+USER_SCHEMA = (
+    ('user_id', str, None),
+    ('name', str, None),
+    ('email', str, None),
+)
+LOAN_SCHEMA = (
+    ('user_id', str, None),
+    ('isbn', str, None),
+)
+
+# Payloads de error precalculados para los mensajes fijos de validación
+_ERROR_PAYLOADS = {
+    message: dumps({'success': False, 'message': message, 'data': None})
+    for message in (
+        "Body JSON requerido",
+        "Body JSON debe ser un objeto",
+        "Parámetro de búsqueda 'q' requerido",
+        "ISBN requerido",
+        "ID de usuario requerido",
+        "Libro no encontrado",
+        "Usuario no encontrado",
+        "Endpoint no encontrado",
+        "Método HTTP no permitido",
+        "Error interno del servidor",
+        *{f"Campo requerido: {field}"
+          for schema in (BOOK_SCHEMA, USER_SCHEMA, LOAN_SCHEMA)
+          for field, _, _ in schema},
+    )
+}
+
+def clean_str(value):
+    """Limpiar espacios; los str (caso común en JSON) no pasan por str()"""
+    return value.strip() if type(value) is str else str(value).strip()
+
+def parse_body(schema):
+    """
+    Validar y convertir el body JSON según un esquema en una sola pasada
+    Cada campo se verifica, limpia y convierte una única vez
+    Retorna (respuesta_error, valores) con los valores en el orden del esquema
+    """
+    error_response_obj, data = validate_json_request()
+    if error_response_obj:
+        return error_response_obj, None
+    if not isinstance(data, dict):
+        return error_response("Body JSON debe ser un objeto"), None
+    
+    values = []
+    try:
+        for field, kind, default in schema:
+            value = data.get(field, default)
+            text = None if value is None else clean_str(value)
+            if not text:
+                return error_response(f"Campo requerido: {field}"), None
+            values.append(text if kind is str else kind(value))
+    except (ValueError, TypeError) as ve:
+        return error_response(f"Datos inválidos: {str(ve)}"), None
+    
+    return None, values
 
 # ==================== ENDPOINTS DE LIBROS ====================
 
@@ -99,12 +279,13 @@ def get_books():
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        print("📚 GET /api/books - Iniciando...")
-        books = library_service.get_books_json()
-        print(f"📚 GET /api/books - {len(books)} libros encontrados")
-        return success_response(books, f"Se encontraron {len(books)} libros")
+        def build():
+            books = library_service.get_books_json()
+            logger.debug("GET /api/books n=%d", len(books))
+            return books, f"Se encontraron {len(books)} libros"
+        
+        return cached_response(build)
     except Exception as e:
-        print(f"❌ GET /api/books - Error: {str(e)}")
         return handle_exception(e)
 
 @app.route('/api/books/search', methods=['GET'])
@@ -128,19 +309,19 @@ def search_books():
 def get_popular_books():
     """
     Obtener libros más populares
-    Complejidad: O(n) - Recorrido ordenado del índice de popularidad
+    Complejidad: O(h + limit) - Recorrido inverso parcial del índice de popularidad
     """
     try:
-        limit = int(request.args.get('limit', 10))
-        popular_books = library_service.get_most_borrowed_books(limit)
+        limit = parse_limit(10)
         
-        result = []
-        for book, times_borrowed in popular_books:
-            book_data = book.to_dict()
-            book_data['times_borrowed'] = times_borrowed
-            result.append(book_data)
+        def build():
+            result = [
+                {**book.to_dict(), 'times_borrowed': times_borrowed}
+                for book, times_borrowed in library_service.get_most_borrowed_books(limit)
+            ]
+            return result, f"Top {len(result)} libros más populares"
         
-        return success_response(result, f"Top {len(result)} libros más populares")
+        return cached_response(build)
     except Exception as e:
         return handle_exception(e)
 
@@ -148,12 +329,12 @@ def get_popular_books():
 def get_book(isbn):
     """
     Obtener libro por ISBN
-    Complejidad: O(log n) - Búsqueda en BST
+    Complejidad: O(1) - tabla hash
     """
     try:
         book = library_service.get_book(isbn)
         if book:
-            return success_response(book.to_dict(), "Libro encontrado")
+            return success_response(book, "Libro encontrado")
         else:
             return error_response("Libro no encontrado", 404)
     except Exception as e:
@@ -166,49 +347,25 @@ def add_book():
     GARANTIZA: Respuesta JSON válida en TODOS los casos
     """
     try:
-        # Validar JSON request
-        error_response_obj, data = validate_json_request()
+        # Validar JSON request, campos requeridos y tipos en una sola pasada
+        error_response_obj, values = parse_body(BOOK_SCHEMA)
         if error_response_obj:
             return error_response_obj
+        isbn, title, author, year, copies = values
         
-        # Validar campos requeridos con verificación robusta
-        required_fields = ['isbn', 'title', 'author', 'year']
-        for field in required_fields:
-            if field not in data or not str(data[field]).strip():
-                return error_response(f"Campo requerido: {field}")
-        
-        # Extraer y validar datos
-        try:
-            isbn = str(data['isbn']).strip()
-            title = str(data['title']).strip()
-            author = str(data['author']).strip()
-            year = int(data['year'])
-            copies = int(data.get('copies', 1))
-            
-            # Validaciones adicionales
-            if len(isbn) < 10:
-                return error_response("ISBN debe tener al menos 10 caracteres")
-            if year < 1000 or year > 2030:
-                return error_response("Año debe estar entre 1000 y 2030")
-            if copies < 1 or copies > 100:
-                return error_response("Número de copias debe estar entre 1 y 100")
-                
-        except (ValueError, TypeError) as ve:
-            return error_response(f"Datos inválidos: {str(ve)}")
+        # Validaciones adicionales
+        if len(isbn) < 10:
+            return error_response("ISBN debe tener al menos 10 caracteres")
+        if year < 1000 or year > 2030:
+            return error_response("Año debe estar entre 1000 y 2030")
+        if copies < 1 or copies > 100:
+            return error_response("Número de copias debe estar entre 1 y 100")
         
         # Intentar agregar el libro
-        success = library_service.add_book(isbn, title, author, year, copies)
+        book = library_service.add_book(isbn, title, author, year, copies)
         
-        if success:
-            book = library_service.get_book(isbn)
-            if book:
-                try:
-                    book_data = book.to_dict()
-                    return success_response(book_data, "Libro agregado exitosamente")
-                except Exception as e:
-                    return success_response({}, "Libro agregado exitosamente")
-            else:
-                return error_response("Error al recuperar el libro agregado")
+        if book:
+            return success_response(book, "Libro agregado exitosamente")
         else:
             return error_response("Error al agregar libro - posiblemente ISBN duplicado")
             
@@ -240,12 +397,14 @@ def get_users():
     Complejidad: O(n) - Recorrido in-order del BST
     """
     try:
-        print("👥 GET /api/users - Iniciando...")
-        users = library_service.get_users_json()
-        print(f"👥 GET /api/users - {len(users)} usuarios encontrados")
-        return success_response(users, f"Se encontraron {len(users)} usuarios")
+        def build():
+            users = library_service.get_users_json()
+            logger.debug("GET /api/users n=%d", len(users))
+            return users, f"Se encontraron {len(users)} usuarios"
+        
+        # activity_score depende de la fecha actual, no solo de la versión
+        return cached_response(build, daily=True)
     except Exception as e:
-        print(f"❌ GET /api/users - Error: {str(e)}")
         return handle_exception(e)
 
 @app.route('/api/users/search', methods=['GET'])
@@ -268,19 +427,20 @@ def search_users():
 def get_active_users():
     """
     Obtener usuarios más activos
-    Complejidad: O(n) - Recorrido ordenado del índice de actividad
+    Complejidad: O(h + limit) - Recorrido inverso parcial del índice de actividad
     """
     try:
-        limit = int(request.args.get('limit', 10))
-        active_users = library_service.get_most_active_users(limit)
+        limit = parse_limit(10)
         
-        result = []
-        for user, activity_score in active_users:
-            user_data = user.to_dict()
-            user_data['activity_score'] = activity_score
-            result.append(user_data)
+        def build():
+            result = [
+                {**user.to_dict(), 'activity_score': activity_score}
+                for user, activity_score in library_service.get_most_active_users(limit)
+            ]
+            return result, f"Top {len(result)} usuarios más activos"
         
-        return success_response(result, f"Top {len(result)} usuarios más activos")
+        # activity_score depende de la fecha actual, no solo de la versión
+        return cached_response(build, daily=True)
     except Exception as e:
         return handle_exception(e)
 
@@ -288,16 +448,16 @@ def get_active_users():
 def get_user(user_id):
     """
     Obtener usuario por ID
-    Complejidad: O(log n) - Búsqueda en BST
+    Complejidad: O(1) - tabla hash
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        if not isbn or not isbn.strip():
-            return error_response("ISBN requerido")
-            
+        if not user_id or not user_id.strip():
+            return error_response("ID de usuario requerido")
+        
         user = library_service.get_user(user_id)
         if user:
-            return success_response(user.to_dict(), "Usuario encontrado")
+            return success_response(user, "Usuario encontrado")
         else:
             return error_response("Usuario no encontrado", 404)
     except Exception as e:
@@ -310,23 +470,16 @@ def add_user():
     Complejidad: O(log n) - Inserción en BST e índices
     """
     try:
-        data = request.get_json()
-        
-        # Validar datos requeridos
-        required_fields = ['user_id', 'name', 'email']
-        for field in required_fields:
-            if field not in data:
-                return error_response(f"Campo requerido: {field}")
-        
-        user_id = data['user_id']
-        name = data['name']
-        email = data['email']
+        # Validar JSON request y campos requeridos en una sola pasada
+        error_response_obj, values = parse_body(USER_SCHEMA)
+        if error_response_obj:
+            return error_response_obj
+        user_id, name, email = values
         
-        success = library_service.add_user(user_id, name, email)
+        user = library_service.add_user(user_id, name, email)
         
-        if success:
-            user = library_service.get_user(user_id)
-            return success_response(user.to_dict(), "Usuario agregado exitosamente")
+        if user:
+            return success_response(user, "Usuario agregado exitosamente")
         else:
             return error_response("Error al agregar usuario (ID ya existe)")
     
@@ -341,9 +494,9 @@ def delete_user(user_id):
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        if not isbn or not isbn.strip():
-            return error_response("ISBN requerido")
-            
+        if not user_id or not user_id.strip():
+            return error_response("ID de usuario requerido")
+        
         success = library_service.remove_user(user_id)
         
         if success:
@@ -357,12 +510,11 @@ def delete_user(user_id):
 def get_user_books(user_id):
     """
     Obtener libros prestados por usuario
-            return success_response({}, "Libro eliminado exitosamente")
+    Complejidad: O(k) donde k es número de libros prestados
     """
     try:
         books = library_service.get_user_borrowed_books(user_id)
-        books_data = [book.to_dict() for book in books]
-        return success_response(books_data, f"Usuario tiene {len(books)} libros prestados")
+        return success_response(books, f"Usuario tiene {len(books)} libros prestados")
     except Exception as e:
         return handle_exception(e)
 
@@ -370,8 +522,10 @@ def get_user_books(user_id):
 
 @app.route('/api/loans', methods=['GET'])
 def get_loans():
+    """
+    Obtener todos los préstamos activos
     GARANTIZA: Respuesta JSON válida siempre
-    """Obtener todos los préstamos activos"""
+    """
     try:
         loans = library_service.get_active_loans()
         return success_response(loans, f"Se encontraron {len(loans)} préstamos activos")
@@ -382,37 +536,21 @@ def get_loans():
 def borrow_book():
     """
     Prestar libro a usuario
-    Complejidad: O(log n) - Búsquedas en BST
+    Complejidad: O(1) búsquedas en tablas hash + O(log n) actualización de índices
     VALIDACIÓN: JSON request y campos requeridos
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        # Validar JSON request
-        error_response_obj, data = validate_json_request()
+        # Validar JSON request y campos requeridos en una sola pasada
+        error_response_obj, values = parse_body(LOAN_SCHEMA)
         if error_response_obj:
             return error_response_obj
+        user_id, isbn = values
         
-        # Validar datos requeridos
-        if 'user_id' not in data or 'isbn' not in data:
-            return error_response("Campos requeridos: user_id, isbn")
-            if field not in data or not str(data[field]).strip():
-        # Extraer y validar datos
-        user_id = str(data['user_id']).strip()
-        name = str(data['name']).strip()
-        email = str(data['email']).strip()
-        
-        # Validaciones adicionales
-        if len(user_id) < 2:
-            return error_response("ID de usuario debe tener al menos 2 caracteres")
-        if '@' not in email or '.' not in email:
-            return error_response("Email debe tener formato válido")
         success, message = library_service.borrow_book(user_id, isbn)
         
         if success:
-            if user:
-                return success_response(user.to_dict(), "Usuario agregado exitosamente")
-            else:
-                return error_response("Error al recuperar el usuario agregado")
+            return success_response({'user_id': user_id, 'isbn': isbn}, message)
         else:
             return error_response(message)
             
@@ -423,27 +561,24 @@ def borrow_book():
 def return_book(user_id, isbn):
     """
     Devolver libro prestado
-    Complejidad: O(log n) - Búsquedas en BST
-    VALIDACIÓN: JSON request y campos requeridos
+    Complejidad: O(1) búsquedas en tablas hash + O(log n) actualización de índices
+    VALIDACIÓN: Parámetros de ruta requeridos
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        # Validar JSON request
-        error_response_obj, data = validate_json_request()
-        user_id = str(data['user_id']).strip()
-    GARANTIZA: Respuesta JSON válida siempre
-        isbn = str(data['isbn']).strip()
+        user_id = user_id.strip()
+        isbn = isbn.strip()
         
-        if not user_id or not user_id.strip():
+        if not user_id:
             return error_response("ID de usuario requerido")
-        if not isbn or not isbn.strip():
+        if not isbn:
             return error_response("ISBN requerido")
-            
+        
+        success, message = library_service.return_book(user_id, isbn)
+        
         if success:
-        required_fields = ['user_id', 'isbn']
-        for field in required_fields:
             return success_response({}, message)
-                return error_response(f"Campo requerido: {field}")
+        else:
             return error_response(message)
             
     except Exception as e:
@@ -458,19 +593,19 @@ def get_statistics():
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        print("📊 GET /api/stats - Iniciando...")
-        stats = library_service.get_general_statistics()
-        print(f"📊 GET /api/stats - Estadísticas calculadas: {stats}")
-        return success_response(stats, "Estadísticas generales")
+        def build():
+            stats = library_service.get_general_statistics()
+            return stats, "Estadísticas generales"
+        
+        return cached_response(build)
     except Exception as e:
-        print(f"❌ GET /api/stats - Error: {str(e)}")
         return handle_exception(e)
 
 @app.route('/api/history', methods=['GET'])
 def get_history():
     """Obtener historial de operaciones"""
     try:
-        limit = int(request.args.get('limit', 20))
+        limit = parse_limit(20)
         history = library_service.get_operation_history(limit)
         return success_response(history, f"Últimas {len(history)} operaciones")
     except Exception as e:
@@ -506,16 +641,20 @@ def get_notifications():
 def health_check():
     """
     Verificar estado del sistema
+    Servido desde caché mientras no cambien los datos (sondeos frecuentes)
     GARANTIZA: Respuesta JSON válida siempre
     """
     try:
-        stats = library_service.get_general_statistics()
-        return success_response({
-            'status': 'healthy',
-            'books_count': stats.get('total_books', 0),
-            'users_count': stats.get('total_users', 0),
-            'active_loans': stats.get('borrowed_copies', 0)
-        }, "Sistema funcionando correctamente")
+        def build():
+            stats = library_service.get_general_statistics()
+            return {
+                'status': 'healthy',
+                'books_count': stats.get('total_books', 0),
+                'users_count': stats.get('total_users', 0),
+                'active_loans': stats.get('borrowed_copies', 0)
+            }, "Sistema funcionando correctamente"
+        
+        return cached_response(build)
     except Exception as e:
         return handle_exception(e)
 
@@ -538,20 +677,24 @@ def internal_error(error):
 
 @app.before_request
 def before_request():
-    """Configurar headers para todas las respuestas"""
-    pass
+    """
+    Responder preflights CORS (OPTIONS) sin pasar por el despacho de rutas
+    Solo para rutas existentes de la API: el resto llega al manejador 404
+    """
+    if (request.method == 'OPTIONS' and request.url_rule is not None
+            and request.path.startswith('/api/')):
+        return app.response_class(status=204)
 
 @app.after_request
 def after_request(response):
     """Asegurar headers correctos en todas las respuestas"""
-    try:
-        response.headers['Content-Type'] = 'application/json'
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-    except:
-        pass  # No fallar si hay error con headers
+    if response.status_code in BODYLESS_STATUSES:
+        response.headers.remove('Content-Type')
+        response.headers.update(CORS_HEADERS)
+    else:
+        response.headers.update(RESPONSE_HEADERS)
     return response
+
 # ==================== INICIALIZACIÓN ====================
 
 if __name__ == '__main__':
@@ -559,4 +702,6 @@ if __name__ == '__main__':
     print("📚 Estructuras de datos optimizadas cargadas")
     print("🌐 Servidor disponible en http://localhost:5000")
     print("✅ Respuestas JSON garantizadas en todos los endpoints")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Servidor de desarrollo; en producción: gunicorn ... wsgi:app (ver wsgi.py)
+    app.run(host='0.0.0.0', port=5000, threaded=True,
+            debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file
@@ -4,6 +4,7 @@ Implementación de Estructuras de Datos Lineales
 
 Este módulo contiene las implementaciones de:
 - Lista enlazada simple
+- Colección indexada por clave
 - Pila (Stack) 
 - Cola (Queue)
 - Arreglo dinámico
@@ -12,8 +13,13 @@ Estas estructuras se usan para el almacenamiento y gestión de datos
 en el sistema de biblioteca.
 """
 
+from collections import deque
+from itertools import islice
+
 class Node:
     """Nodo para lista enlazada"""
+    __slots__ = ('data', 'next')
+    
     def __init__(self, data):
         self.data = data
         self.next = None
@@ -26,18 +32,20 @@ class LinkedList:
     """
     def __init__(self):
         self.head = None
+        self.tail = None        # Último nodo: append en O(1) sin recorrer la lista
         self.size = 0
     
     def append(self, data):
-        """Agregar elemento al final"""
+        """
+        Agregar elemento al final
+        Complejidad: O(1) gracias al puntero tail
+        """
         new_node = Node(data)
         if not self.head:
-            self.head = new_node
+            self.head = self.tail = new_node
         else:
-            current = self.head
-            while current.next:
-                current = current.next
-            current.next = new_node
+            self.tail.next = new_node
+            self.tail = new_node
         self.size += 1
     
     def remove(self, key, key_func):
@@ -47,12 +55,16 @@ class LinkedList:
         
         if key_func(self.head.data) == key:
             self.head = self.head.next
+            if self.head is None:
+                self.tail = None
             self.size -= 1
             return True
         
         current = self.head
         while current.next:
             if key_func(current.next.data) == key:
+                if current.next is self.tail:
+                    self.tail = current
                 current.next = current.next.next
                 self.size -= 1
                 return True
@@ -102,14 +114,91 @@ class LinkedList:
         items = [str(item) for item in self.to_list()]
         return f"LinkedList({len(items)} items: {', '.join(items[:3])}{'...' if len(items) > 3 else ''})"
 
+class IndexedCollection:
+    """
+    ESTRUCTURA: COLECCIÓN INDEXADA (TABLA HASH CON ORDEN DE INSERCIÓN)
+    Uso: Almacenamiento con búsqueda/eliminación por clave conocida
+    Ventajas: find/remove O(1) por clave sin recorrer nodos; el dict de
+    Python conserva el orden de inserción para la iteración
+    """
+    def __init__(self):
+        self._by_key = {}
+    
+    def append(self, data, key=None):
+        """
+        Agregar elemento al final (la clave por defecto es el propio dato)
+        Complejidad: O(1)
+        """
+        self._by_key[data if key is None else key] = data
+    
+    def add_unique(self, data, key=None):
+        """
+        Agregar elemento solo si su clave no existe, en una única operación
+        Retorna True si se insertó
+        Complejidad: O(1)
+        """
+        by_key = self._by_key
+        size = len(by_key)
+        by_key.setdefault(data if key is None else key, data)
+        return len(by_key) != size
+    
+    def remove(self, key):
+        """
+        Eliminar elemento por clave
+        Complejidad: O(1)
+        """
+        return self._by_key.pop(key, None) is not None
+    
+    def find(self, key):
+        """
+        Buscar elemento por clave
+        Complejidad: O(1)
+        """
+        return self._by_key.get(key)
+    
+    def to_list(self):
+        """Convertir a lista Python en orden de inserción"""
+        return list(self._by_key.values())
+    
+    def search(self, query, search_func):
+        """Buscar elementos que coincidan con criterio"""
+        return [data for data in self._by_key.values() if search_func(data, query)]
+    
+    def is_empty(self):
+        """Verificar si la colección está vacía"""
+        return not self._by_key
+    
+    def __contains__(self, key):
+        """Permitir uso de 'in' por clave en O(1)"""
+        return key in self._by_key
+    
+    def __iter__(self):
+        """Iterar los elementos en orden de inserción sin copiarlos"""
+        return iter(self._by_key.values())
+    
+    def __len__(self):
+        """Permitir usar len() con IndexedCollection"""
+        return len(self._by_key)
+    
+    def __str__(self):
+        """Representación en string de la colección"""
+        if self.is_empty():
+            return "IndexedCollection(empty)"
+        items = [str(item) for item in self.to_list()[:3]]
+        more = '...' if len(self._by_key) > 3 else ''
+        return f"IndexedCollection({len(self._by_key)} items: {', '.join(items)}{more})"
+
 class Stack:
     """
     ESTRUCTURA: PILA (LIFO - Last In, First Out)
     Uso: Historial de operaciones y navegación de menús
     Ventajas: Acceso rápido al último elemento, ideal para deshacer operaciones
+    
+    Con max_size la pila queda acotada: al superar el límite se descartan
+    los elementos más antiguos (fondo de la pila) en O(1)
     """
-    def __init__(self):
-        self.items = []
+    def __init__(self, max_size=None):
+        self.items = deque(maxlen=max_size)
     
     def push(self, item):
         """Agregar elemento al tope de la pila"""
@@ -137,7 +226,15 @@ class Stack:
     
     def to_list(self):
         """Convertir a lista (del más reciente al más antiguo)"""
-        return self.items[::-1]
+        return list(reversed(self.items))
+    
+    def peek_recent(self, limit):
+        """
+        Ver los 'limit' elementos más recientes sin removerlos
+        Complejidad: O(limit) - no copia la pila completa
+        Un límite negativo se trata como 0 (islice no acepta negativos)
+        """
+        return list(islice(reversed(self.items), max(limit, 0)))
     
     def __len__(self):
         """Permitir usar len() con Stack"""
@@ -156,17 +253,28 @@ class Queue:
     Ventajas: Procesamiento justo por orden de llegada
     """
     def __init__(self):
-        self.items = []
+        # deque: inserción y extracción O(1) en ambos extremos
+        self.items = deque()
     
     def enqueue(self, item):
         """Agregar elemento al final de la cola"""
         self.items.append(item)
     
     def dequeue(self):
-        """Remover y retornar elemento del frente"""
-        if not self.is_empty():
-            return self.items.pop(0)
-        return None
+        """
+        Remover y retornar elemento del frente
+        Complejidad: O(1) - popleft no desplaza los elementos restantes
+        """
+        return self.items.popleft() if self.items else None
+    
+    def drain(self):
+        """
+        Remover y retornar todos los elementos en orden FIFO
+        Complejidad: O(n) en C - copia y vaciado en bloque, sin dequeue por elemento
+        """
+        items = list(self.items)
+        self.items.clear()
+        return items
     
     def front(self):
         """Ver elemento del frente sin removerlo"""
@@ -184,7 +292,7 @@ class Queue:
     
     def to_list(self):
         """Convertir a lista"""
-        return self.items.copy()
+        return list(self.items)
     
     def __len__(self):
         """Permitir usar len() con Queue"""
@@ -236,11 +344,16 @@ class DynamicArray:
             raise IndexError("Índice fuera de rango")
     
     def remove_at(self, index):
-        """Remover elemento en índice específico"""
+        """
+        Remover elemento en índice específico
+        El desplazamiento se hace con una sola asignación por slice (memmove
+        en C) en lugar de un bucle Python elemento a elemento
+        """
         if 0 <= index < self.size:
-            for i in range(index, self.size - 1):
-                self.data[i] = self.data[i + 1]
-            self.size -= 1
+            last = self.size - 1
+            self.data[index:last] = self.data[index + 1:self.size]
+            self.data[last] = None  # Liberar la referencia sobrante
+            self.size = last
             return True
         return False
     
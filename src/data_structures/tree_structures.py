@@ -31,6 +31,9 @@ EFICIENCIA LOGRADA:
 
 class TreeNode:
     """Nodo para árbol binario"""
+    # Sin __dict__ por nodo: menos memoria y acceso a atributos por offset
+    __slots__ = ('key', 'data', 'left', 'right', 'height')
+    
     def __init__(self, key, data):
         self.key = key          # Clave para comparación (ISBN, user_id, título)
         self.data = data        # Datos almacenados (Book, User, etc.)
@@ -61,148 +64,180 @@ class BinarySearchTree:
         """
         Insertar elemento en el árbol
         Complejidad: O(log n) promedio, O(n) peor caso
+        Iterativo: desciende guardando el padre y enlaza el nuevo nodo
         """
-        self.root = self._insert_recursive(self.root, key, data)
-        self.size += 1
-    
-    def _insert_recursive(self, node, key, data):
-        """Inserción recursiva manteniendo propiedad BST"""
-        if node is None:
-            return TreeNode(key, data)
+        parent = None
+        node = self.root
+        while node:
+            if key < node.key:
+                parent, node = node, node.left
+            elif key > node.key:
+                parent, node = node, node.right
+            else:
+                # Clave duplicada - actualizar datos sin cambiar el tamaño
+                node.data = data
+                return
         
-        if key < node.key:
-            node.left = self._insert_recursive(node.left, key, data)
-        elif key > node.key:
-            node.right = self._insert_recursive(node.right, key, data)
+        new_node = TreeNode(key, data)
+        if parent is None:
+            self.root = new_node
+        elif key < parent.key:
+            parent.left = new_node
         else:
-            # Clave duplicada - actualizar datos
-            node.data = data
-            self.size -= 1  # No incrementar tamaño
-        
-        return node
+            parent.right = new_node
+        self.size += 1
     
     def search(self, key):
         """
         Buscar elemento por clave
         Complejidad: O(log n) promedio, O(n) peor caso
         """
-        return self._search_recursive(self.root, key)
-    
-    def _search_recursive(self, node, key):
-        """Búsqueda recursiva en BST"""
-        if node is None or node.key == key:
-            return node.data if node else None
-        
-        if key < node.key:
-            return self._search_recursive(node.left, key)
-        else:
-            return self._search_recursive(node.right, key)
+        node = self.root
+        while node:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:
+                return node.data
+        return None
     
     def delete(self, key):
         """
         Eliminar elemento del árbol
         Complejidad: O(log n) promedio
         """
-        self.root, deleted = self._delete_recursive(self.root, key)
-        if deleted:
-            self.size -= 1
-        return deleted
-    
-    def _delete_recursive(self, node, key):
-        """Eliminación recursiva manteniendo propiedad BST"""
+        parent = None
+        node = self.root
+        while node:
+            if key < node.key:
+                parent, node = node, node.left
+            elif key > node.key:
+                parent, node = node, node.right
+            else:
+                break
         if node is None:
-            return node, False
+            return False
         
-        if key < node.key:
-            node.left, deleted = self._delete_recursive(node.left, key)
-        elif key > node.key:
-            node.right, deleted = self._delete_recursive(node.right, key)
-        else:
-            # Nodo encontrado - eliminar
-            if node.left is None:
-                return node.right, True
-            elif node.right is None:
-                return node.left, True
-            else:
-                # Nodo con dos hijos - reemplazar con sucesor
-                successor = self._find_min(node.right)
-                node.key = successor.key
-                node.data = successor.data
-                node.right, _ = self._delete_recursive(node.right, successor.key)
-                return node, True
+        if node.left and node.right:
+            # Nodo con dos hijos - copiar el sucesor y eliminar su nodo
+            parent, successor = node, node.right
+            while successor.left:
+                parent, successor = successor, successor.left
+            node.key = successor.key
+            node.data = successor.data
+            node = successor
         
-        return node, deleted
-    
-    def _find_min(self, node):
-        """Encontrar nodo con clave mínima"""
-        while node.left:
-            node = node.left
-        return node
+        # El nodo a desenlazar tiene como máximo un hijo
+        child = node.left if node.left else node.right
+        if parent is None:
+            self.root = child
+        elif parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+        self.size -= 1
+        return True
     
     def inorder_traversal(self):
         """
         Recorrido in-order (izquierda, raíz, derecha)
         Retorna elementos en orden ascendente
         Complejidad: O(n)
+
+        Iterativo con pila explícita: evita una llamada de función Python
+        por nodo y el límite de recursión en árboles degenerados
         """
         result = []
-        self._inorder_recursive(self.root, result)
+        append = result.append
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            append(node.data)
+            node = node.right
         return result
     
-    def _inorder_recursive(self, node, result):
-        """Recorrido in-order recursivo"""
-        if node:
-            self._inorder_recursive(node.left, result)
+    def get_largest(self, k):
+        """
+        Obtener los k elementos con mayor clave (orden descendente)
+        Recorrido in-order inverso (derecha, raíz, izquierda) que se detiene
+        al reunir k elementos - útil para rankings top-k
+        Complejidad: O(h + k) donde h es la altura del árbol
+        """
+        result = []
+        stack = []
+        node = self.root
+        while (stack or node) and len(result) < k:
+            while node:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
             result.append(node.data)
-            self._inorder_recursive(node.right, result)
+            node = node.left
+        return result
     
     def search_range(self, min_key, max_key):
         """
         Buscar elementos en rango de claves
         Útil para búsquedas por rango de fechas, IDs, etc.
-        Complejidad: O(log n + k) donde k es número de resultados
+        Complejidad: O(h + k) donde k es número de resultados
+        Recorrido in-order acotado: resultados en orden ascendente de clave
         """
         result = []
-        self._search_range_recursive(self.root, min_key, max_key, result)
-        return result
-    
-    def _search_range_recursive(self, node, min_key, max_key, result):
-        """Búsqueda por rango recursiva"""
-        if node is None:
-            return
-        
-        if min_key <= node.key <= max_key:
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                if node.key < min_key:
+                    # Nodo y subárbol izquierdo quedan fuera del rango
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.key > max_key:
+                break
             result.append(node.data)
-        
-        if min_key < node.key:
-            self._search_range_recursive(node.left, min_key, max_key, result)
-        
-        if max_key > node.key:
-            self._search_range_recursive(node.right, min_key, max_key, result)
+            node = node.right
+        return result
     
     def search_prefix(self, prefix):
         """
         Buscar elementos que comiencen con prefijo
         Útil para autocompletado y búsquedas parciales
-        Complejidad: O(log n + k) donde k es número de coincidencias
+        Complejidad: O(h + k) donde k es número de coincidencias
+
+        Las claves con el prefijo forman un rango contiguo en el orden del
+        árbol: se recorre in-order descartando subárboles menores que el
+        prefijo y se termina en la primera clave mayor que no coincide.
+        Resultados en orden ascendente de clave.
         """
         result = []
-        self._search_prefix_recursive(self.root, prefix, result)
-        return result
-    
-    def _search_prefix_recursive(self, node, prefix, result):
-        """Búsqueda por prefijo recursiva"""
-        if node is None:
-            return
-        
-        if str(node.key).startswith(prefix):
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                if node.key < prefix:
+                    # Nodo y subárbol izquierdo son menores que el prefijo
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if not node.key.startswith(prefix):
+                # Primera clave mayor que todas las coincidencias: fin del rango
+                break
             result.append(node.data)
-        
-        # Continuar búsqueda en ambos lados si es necesario
-        if prefix <= str(node.key):
-            self._search_prefix_recursive(node.left, prefix, result)
-        if prefix >= str(node.key)[:len(prefix)]:
-            self._search_prefix_recursive(node.right, prefix, result)
+            node = node.right
+        return result
     
     def get_all_sorted(self):
         """Obtener todos los elementos ordenados por clave"""
@@ -222,6 +257,154 @@ class BinarySearchTree:
             return "BST(empty)"
         return f"BST({self.size} nodes, root: {self.root.key})"
 
+class HashIndex:
+    """
+    ÍNDICE HASH
+    ===========
+    
+    Índice para campos que solo se consultan por igualdad exacta.
+    Misma interfaz de inserción/búsqueda/eliminación que BinarySearchTree,
+    respaldada por un dict: O(1) promedio en C en lugar de O(log n)
+    comparaciones en Python. No mantiene orden (sin prefijos ni rankings).
+    """
+    
+    def __init__(self):
+        self.table = {}
+    
+    def insert(self, key, data):
+        """Insertar o reemplazar elemento - O(1) promedio"""
+        self.table[key] = data
+    
+    def search(self, key):
+        """Buscar elemento por clave exacta - O(1) promedio"""
+        return self.table.get(key)
+    
+    def delete(self, key):
+        """Eliminar elemento por clave - O(1) promedio"""
+        return self.table.pop(key, None) is not None
+    
+    def get_all_sorted(self):
+        """Obtener todos los elementos ordenados por clave - O(n log n)"""
+        table = self.table
+        return [table[key] for key in sorted(table)]
+    
+    def __len__(self):
+        return len(self.table)
+
+class TrieNode:
+    """Nodo de trie: un hijo por carácter y los elementos cuya clave termina aquí"""
+    __slots__ = ('children', 'items')
+    
+    def __init__(self):
+        self.children = {}      # carácter -> TrieNode
+        self.items = []         # Elementos con clave exactamente igual al camino
+
+class PrefixTrie:
+    """
+    TRIE DE PREFIJOS
+    ================
+    
+    Índice para autocompletado: cada carácter de la clave es un nivel.
+    
+    VENTAJAS:
+    - Búsqueda por prefijo O(m + k): m = largo del prefijo, k = resultados
+      (independiente del tamaño del catálogo)
+    - Claves repetidas (dos libros con el mismo título) conviven en el
+      mismo nodo en lugar de sobrescribirse
+    """
+    
+    def __init__(self):
+        self.root = TrieNode()
+        self.size = 0
+    
+    def insert(self, key, data):
+        """
+        Insertar elemento bajo su clave
+        Complejidad: O(m) donde m es el largo de la clave
+        """
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if not any(item is data for item in node.items):
+            node.items.append(data)
+            self.size += 1
+    
+    def search(self, key):
+        """Buscar primer elemento con clave exacta - O(m)"""
+        node = self._find_node(key)
+        if node is not None and node.items:
+            return node.items[0]
+        return None
+    
+    def delete(self, key, data=None):
+        """
+        Eliminar un elemento (o todos si data es None) de una clave
+        Poda los nodos que quedan vacíos
+        Complejidad: O(m)
+        """
+        path = []
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                return False
+            path.append((node, char))
+            node = child
+        
+        before = len(node.items)
+        if data is None:
+            node.items = []
+        else:
+            node.items = [item for item in node.items if item is not data]
+        removed = before - len(node.items)
+        if not removed:
+            return False
+        self.size -= removed
+        
+        # Podar hacia arriba los nodos sin elementos ni hijos
+        while path and not node.items and not node.children:
+            parent, char = path.pop()
+            del parent.children[char]
+            node = parent
+        return True
+    
+    def _find_node(self, prefix):
+        """Descender hasta el nodo del prefijo - O(m)"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+    
+    def search_prefix(self, prefix):
+        """
+        Buscar elementos cuya clave comienza con el prefijo
+        Complejidad: O(m + k); resultados en orden ascendente de clave
+        """
+        node = self._find_node(prefix)
+        if node is None:
+            return []
+        result = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            result.extend(node.items)
+            # Hijos en orden inverso: la pila los visita en orden ascendente
+            children = node.children
+            stack.extend(children[char] for char in sorted(children, reverse=True))
+        return result
+    
+    def get_all_sorted(self):
+        """Obtener todos los elementos ordenados por clave"""
+        return self.search_prefix('')
+    
+    def __len__(self):
+        return self.size
+
 class IndexTree:
     """
     ÁRBOL DE ÍNDICES MÚLTIPLES
@@ -239,9 +422,19 @@ class IndexTree:
     def __init__(self):
         self.indexes = {}  # Diccionario de árboles por campo
     
-    def create_index(self, field_name):
-        """Crear nuevo índice para un campo"""
-        self.indexes[field_name] = BinarySearchTree()
+    def create_index(self, field_name, kind='sorted'):
+        """
+        Crear nuevo índice para un campo
+        kind='sorted': BST (prefijos, rangos, rankings)
+        kind='prefix': trie, para autocompletado (admite claves repetidas)
+        kind='hash': dict, solo para búsquedas exactas
+        """
+        if kind == 'hash':
+            self.indexes[field_name] = HashIndex()
+        elif kind == 'prefix':
+            self.indexes[field_name] = PrefixTrie()
+        else:
+            self.indexes[field_name] = BinarySearchTree()
     
     def insert(self, item, key_extractors):
         """
@@ -253,6 +446,21 @@ class IndexTree:
                 key = extractor(item)
                 self.indexes[field_name].insert(key, item)
     
+    def insert_key(self, field_name, key, item):
+        """Insertar elemento en un solo índice con una clave ya calculada"""
+        index = self.indexes.get(field_name)
+        if index is not None:
+            index.insert(key, item)
+    
+    def delete_key(self, field_name, key, item):
+        """Eliminar elemento de un solo índice con la clave con que se insertó"""
+        index = self.indexes.get(field_name)
+        if index is not None:
+            if isinstance(index, PrefixTrie):
+                index.delete(key, item)
+            else:
+                index.delete(key)
+    
     def search_by_field(self, field_name, key):
         """Buscar por campo específico"""
         if field_name in self.indexes:
@@ -268,9 +476,20 @@ class IndexTree:
     def delete(self, item, key_extractors):
         """Eliminar elemento de todos los índices"""
         for field_name, extractor in key_extractors.items():
-            if field_name in self.indexes:
+            index = self.indexes.get(field_name)
+            if index is not None:
                 key = extractor(item)
-                self.indexes[field_name].delete(key)
+                if isinstance(index, PrefixTrie):
+                    # Solo este elemento: otros pueden compartir la clave
+                    index.delete(key, item)
+                else:
+                    index.delete(key)
+    
+    def get_top_by_field(self, field_name, k):
+        """Obtener los k elementos con mayor clave en un campo (descendente)"""
+        if field_name in self.indexes:
+            return self.indexes[field_name].get_largest(k)
+        return []
     
     def get_all_by_field(self, field_name):
         """Obtener todos los elementos ordenados por campo"""
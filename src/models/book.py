@@ -1,6 +1,10 @@
+from collections import deque
 from datetime import datetime
 from typing import Optional, List
-from src.data_structures.linear_structures import Stack, DynamicArray
+from src.data_structures.linear_structures import Stack
+
+# Máximo de registros de préstamo/devolución conservados por libro
+LOAN_HISTORY_LIMIT = 100
 
 class Book:
     """
@@ -9,13 +13,18 @@ class Book:
     
     Utiliza estructuras lineales para:
     - Stack: Historial de préstamos (LIFO - último préstamo primero)
-    - DynamicArray: Lista de usuarios que actualmente tienen el libro
+    - Tabla hash (dict): Usuarios que actualmente tienen el libro
     
     JUSTIFICACIÓN:
     - Stack para historial: Acceso rápido a préstamos recientes O(1)
-    - DynamicArray para préstamos activos: Acceso aleatorio eficiente O(1)
+    - dict para préstamos activos: Alta y devolución O(1) por user_id
     """
     
+    # Atributos fijos: sin __dict__ por instancia, acceso por offset
+    __slots__ = ('isbn', 'title', 'author', 'year', 'total_copies', 'available_copies',
+                 'borrowed_by', 'loan_history', 'times_borrowed', 'recent_actions',
+                 'created_at')
+    
     def __init__(self, isbn: str, title: str, author: str, year: int, copies: int = 1):
         self.isbn = isbn
         self.title = title
@@ -24,13 +33,18 @@ class Book:
         self.total_copies = copies
         self.available_copies = copies
         
-        # ESTRUCTURA LINEAL: ARREGLO DINÁMICO para préstamos activos
-        # Permite acceso rápido por índice y redimensionamiento automático
-        self.borrowed_by = DynamicArray()  # Usuarios que tienen el libro prestado
+        # TABLA HASH para préstamos activos: user_id -> registro de préstamo
+        # La devolución localiza el registro en O(1) sin recorrer préstamos
+        self.borrowed_by = {}  # Usuarios que tienen el libro prestado
         
         # ESTRUCTURA LINEAL: PILA para historial de préstamos
         # LIFO - Los préstamos más recientes son más relevantes
-        self.loan_history = Stack()  # Historial completo de operaciones
+        # Acotada: memoria constante por libro; los totales van en contadores
+        self.loan_history = Stack(LOAN_HISTORY_LIMIT)  # Operaciones más recientes
+        
+        # Contadores incrementales del historial: evitan recorrerlo completo
+        self.times_borrowed = 0                 # Total de préstamos
+        self.recent_actions = deque(maxlen=10)  # True=préstamo en las últimas 10 operaciones
         
         self.created_at = datetime.now()
     
@@ -38,10 +52,18 @@ class Book:
         """Verificar si hay copias disponibles"""
         return self.available_copies > 0
     
-    def borrow(self, user_id: str) -> bool:
+    def is_fully_available(self) -> bool:
+        """
+        Verificar si no hay copias prestadas
+        Complejidad: O(1) - Tabla hash de préstamos activos vacía
+        """
+        return not self.borrowed_by
+    
+    def borrow(self, user_id: str, timestamp: Optional[datetime] = None) -> bool:
         """
         Prestar libro a un usuario
-        Complejidad: O(1) - Inserción al final del arreglo dinámico
+        timestamp: momento de la operación (se reutiliza el del llamador si lo da)
+        Complejidad: O(1) - Inserción en tabla hash
         """
         if self.is_available():
             self.available_copies -= 1
@@ -49,44 +71,44 @@ class Book:
             # Registro de préstamo
             loan_record = {
                 'user_id': user_id,
-                'borrowed_date': datetime.now(),
+                'borrowed_date': timestamp or datetime.now(),
                 'action': 'borrow'
             }
             
-            # Agregar a préstamos activos (Arreglo Dinámico)
-            self.borrowed_by.append(loan_record)
+            # Agregar a préstamos activos (tabla hash por usuario)
+            self.borrowed_by[user_id] = loan_record
             
             # Agregar al historial (Pila)
             self.loan_history.push(loan_record)
+            self.times_borrowed += 1
+            self.recent_actions.append(True)
             
             return True
         return False
     
-    def return_book(self, user_id: str) -> bool:
+    def return_book(self, user_id: str, timestamp: Optional[datetime] = None) -> bool:
         """
         Devolver libro de un usuario
-        Complejidad: O(n) - Búsqueda en arreglo dinámico
+        timestamp: momento de la operación (se reutiliza el del llamador si lo da)
+        Complejidad: O(1) - Eliminación en tabla hash
         """
-        # Buscar en arreglo dinámico de préstamos activos
-        for i in range(len(self.borrowed_by)):
-            borrow_record = self.borrowed_by.get(i)
-            if borrow_record['user_id'] == user_id:
-                self.available_copies += 1
-                self.borrowed_by.remove_at(i)
-                
-                # Agregar registro de devolución al historial
-                return_record = {
-                    'user_id': user_id,
-                    'returned_date': datetime.now(),
-                    'action': 'return'
-                }
-                self.loan_history.push(return_record)
-                return True
-        return False
+        if self.borrowed_by.pop(user_id, None) is None:
+            return False
+        self.available_copies += 1
+        
+        # Agregar registro de devolución al historial
+        return_record = {
+            'user_id': user_id,
+            'returned_date': timestamp or datetime.now(),
+            'action': 'return'
+        }
+        self.loan_history.push(return_record)
+        self.recent_actions.append(False)
+        return True
     
     def get_current_borrowers(self) -> List[str]:
         """Obtener lista de usuarios que actualmente tienen el libro"""
-        return [self.borrowed_by.get(i)['user_id'] for i in range(len(self.borrowed_by))]
+        return list(self.borrowed_by)
     
     def get_loan_history(self) -> List[dict]:
         """
@@ -98,34 +120,25 @@ class Book:
     def get_times_borrowed(self) -> int:
         """
         Obtener número de veces que se ha prestado el libro
-        Complejidad: O(n) - Recorrido de historial
+        Complejidad: O(1) - Contador incremental
         """
-        count = 0
-        for record in self.loan_history.to_list():
-            if record.get('action') == 'borrow':
-                count += 1
-        return count
+        return self.times_borrowed
     
     def get_popularity_score(self) -> float:
         """
         Calcular puntuación de popularidad basada en préstamos
         Útil para recomendaciones y estadísticas
+        Complejidad: O(1) - Sin recorrer el historial
         """
-        times_borrowed = self.get_times_borrowed()
+        times_borrowed = self.times_borrowed
         if times_borrowed == 0:
             return 0.0
         
         # Factor de popularidad: préstamos / copias totales
         base_score = times_borrowed / self.total_copies
         
-        # Bonus por préstamos recientes (últimos 10)
-        recent_loans = 0
-        history = self.loan_history.to_list()[:10]
-        for record in history:
-            if record.get('action') == 'borrow':
-                recent_loans += 1
-        
-        recent_bonus = recent_loans * 0.1
+        # Bonus por préstamos recientes (últimas 10 operaciones)
+        recent_bonus = self.recent_actions.count(True) * 0.1
         return base_score + recent_bonus
     
     def to_dict(self) -> dict:
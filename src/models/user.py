@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List, Dict
-from src.data_structures.linear_structures import LinkedList, Queue
+from typing import List, Dict, Optional
+from src.data_structures.linear_structures import IndexedCollection, Queue
 
 class User:
     """
@@ -8,59 +8,62 @@ class User:
     =========================================================
     
     Utiliza estructuras lineales para:
-    - LinkedList: Libros prestados actualmente (inserción/eliminación eficiente)
+    - IndexedCollection: Libros prestados actualmente (búsqueda/eliminación por ISBN)
     - Queue: Solicitudes de préstamos pendientes (FIFO - justo por orden de llegada)
     
     JUSTIFICACIÓN:
-    - LinkedList para préstamos: Inserción/eliminación O(1) al inicio
+    - IndexedCollection para préstamos: Búsqueda/inserción/eliminación O(1) por ISBN
     - Queue para solicitudes: Procesamiento justo FIFO O(1) enqueue/dequeue
     """
     
+    # Atributos fijos: sin __dict__ por instancia, acceso por offset
+    __slots__ = ('user_id', 'name', 'email', 'borrowed_books', 'pending_requests',
+                 'registration_date', 'last_activity')
+    
     def __init__(self, user_id: str, name: str, email: str):
         self.user_id = user_id
         self.name = name
         self.email = email
         
-        # ESTRUCTURA LINEAL: LISTA ENLAZADA para libros prestados
-        # Permite inserción/eliminación eficiente sin reorganizar elementos
-        self.borrowed_books = LinkedList()  # ISBNs de libros prestados
+        # COLECCIÓN INDEXADA para libros prestados
+        # Búsqueda y eliminación por ISBN sin recorrer nodos, en orden de préstamo
+        self.borrowed_books = IndexedCollection()  # ISBNs de libros prestados
         
         # ESTRUCTURA LINEAL: COLA para solicitudes pendientes
         # FIFO - Las solicitudes se procesan por orden de llegada
         self.pending_requests = Queue()  # Cola de solicitudes de préstamo
         
         self.registration_date = datetime.now()
-        self.last_activity = datetime.now()
+        self.last_activity = self.registration_date
     
-    def borrow_book(self, isbn: str) -> bool:
+    def borrow_book(self, isbn: str, timestamp: Optional[datetime] = None) -> bool:
         """
         Agregar libro a la lista de prestados
-        Complejidad: O(n) - Verificación de duplicados + O(1) inserción
+        timestamp: momento de la operación (se reutiliza el del llamador si lo da)
+        Complejidad: O(1) - Verificación de duplicados e inserción por clave
         """
-        if not self.has_book(isbn):
-            self.borrowed_books.append(isbn)
-            self.last_activity = datetime.now()
+        if self.borrowed_books.add_unique(isbn):
+            self.last_activity = timestamp or datetime.now()
             return True
         return False
     
-    def return_book(self, isbn: str) -> bool:
+    def return_book(self, isbn: str, timestamp: Optional[datetime] = None) -> bool:
         """
         Remover libro de la lista de prestados
-        Complejidad: O(n) - Búsqueda y eliminación en lista enlazada
+        timestamp: momento de la operación (se reutiliza el del llamador si lo da)
+        Complejidad: O(1) - Eliminación por clave
         """
-        if self.has_book(isbn):
-            success = self.borrowed_books.remove(isbn, lambda x: x)
-            if success:
-                self.last_activity = datetime.now()
-            return success
-        return False
+        success = self.borrowed_books.remove(isbn)
+        if success:
+            self.last_activity = timestamp or datetime.now()
+        return success
     
     def has_book(self, isbn: str) -> bool:
         """
         Verificar si el usuario tiene un libro específico
-        Complejidad: O(n) - Búsqueda en lista enlazada
+        Complejidad: O(1) - Búsqueda por clave
         """
-        return self.borrowed_books.find(isbn, lambda x: x) is not None
+        return isbn in self.borrowed_books
     
     def add_pending_request(self, isbn: str, priority: str = 'normal') -> None:
         """
@@ -85,7 +88,7 @@ class User:
     def get_borrowed_books_list(self) -> List[str]:
         """
         Obtener lista de libros prestados
-        Complejidad: O(n) - Conversión de lista enlazada a lista Python
+        Complejidad: O(n) - Copia de la colección a lista Python
         """
         return self.borrowed_books.to_list()
     
@@ -1,10 +1,75 @@
+import re
+from collections import namedtuple
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from src.models.book import Book
 from src.models.user import User
-from src.data_structures.linear_structures import LinkedList, Stack, Queue, DynamicArray
+from src.data_structures.linear_structures import IndexedCollection, Stack, Queue
 from src.data_structures.tree_structures import BinarySearchTree, IndexTree
 
+# Máximo de operaciones conservadas en el historial del sistema
+OPERATION_HISTORY_LIMIT = 10_000
+
+# Consulta con forma de ISBN: solo dígitos y guiones, al menos un dígito
+_ISBN_QUERY_RE = re.compile(r'-*[0-9][0-9-]*')
+
+# Prefijos fijos de las notificaciones (un solo objeto str compartido)
+_MSG_ADD_BOOK = "📚 Libro agregado: "
+_MSG_REMOVE_BOOK = "🗑️ Libro eliminado: "
+_MSG_ADD_USER = "👤 Usuario registrado: "
+_MSG_REMOVE_USER = "🗑️ Usuario eliminado: "
+_MSG_BORROW = "📤 Préstamo: "
+_MSG_RETURN = "📥 Devolución: "
+
+# Extractores de clave por índice: se crean una sola vez y se comparten
+# Solo campos estables; los rankings se mantienen aparte con su clave guardada
+_BOOK_KEY_EXTRACTORS = {
+    'title': lambda b: b.title.lower(),
+    'author': lambda b: b.author.lower(),
+    'year': lambda b: str(b.year)
+}
+
+_USER_KEY_EXTRACTORS = {
+    'name': lambda u: u.name.lower(),
+    'email': lambda u: u.email.lower()
+}
+
+def _popularity_key(book: Book) -> Tuple[float, str]:
+    """
+    Clave de ranking de popularidad: (puntaje, isbn)
+    La tupla se compara en C y el ISBN desempata sin formatear cadenas
+    """
+    return (book.get_popularity_score(), book.isbn)
+
+def _activity_key(user: User) -> Tuple[float, str]:
+    """
+    Clave de ranking de actividad: (puntaje, user_id)
+    La tupla se compara en C y el user_id desempata sin formatear cadenas
+    """
+    return (user.get_activity_score(), user.user_id)
+
+class OperationRecord(namedtuple('OperationRecord',
+                                 ('action', 'user_id', 'isbn', 'label', 'timestamp'))):
+    """
+    Registro compacto de una operación del historial
+    Tupla inmutable (sin tabla hash por registro); se convierte a dict
+    solo al consultar el historial
+    """
+    __slots__ = ()
+    
+    def to_dict(self) -> dict:
+        """Convertir al formato de historial (solo los campos presentes)"""
+        record = {'action': self.action}
+        if self.user_id is not None:
+            record['user_id'] = self.user_id
+        if self.isbn is not None:
+            record['isbn'] = self.isbn
+        if self.label is not None:
+            # Título para operaciones de libros, nombre para las de usuarios
+            record['title' if self.user_id is None else 'name'] = self.label
+        record['timestamp'] = self.timestamp
+        return record
+
 class LibraryService:
     """
     SERVICIO PRINCIPAL DE BIBLIOTECA CON ESTRUCTURAS NO LINEALES
@@ -13,8 +78,8 @@ class LibraryService:
     INTEGRACIÓN DE ÁRBOLES BINARIOS:
     ================================
     
-    1. BST para libros por ISBN: Búsqueda O(log n) vs O(n) en lista
-    2. BST para usuarios por ID: Validación rápida de usuarios
+    1. BST para libros por ISBN: Listado ordenado O(n); búsqueda O(1) - tabla hash
+    2. BST para usuarios por ID: Listado ordenado O(n); validación O(1) - tabla hash
     3. IndexTree para búsquedas multi-criterio: título, autor, año
     4. BST para estadísticas: Rankings ordenados automáticamente
     
@@ -23,13 +88,13 @@ class LibraryService:
     
     - Stack: Historial de operaciones (deshacer, auditoría)
     - Queue: Notificaciones del sistema (FIFO)
-    - DynamicArray: Préstamos activos (acceso aleatorio)
+    - IndexedCollection: Préstamos activos por (usuario, ISBN)
     
     EFICIENCIA LOGRADA:
     ==================
-    - Búsquedas: O(n) → O(log n) - Mejora exponencial
+    - Búsquedas por clave: O(n) → O(1) - tabla hash
     - Inserción ordenada: O(n) → O(log n)
-    - Validaciones: O(n) → O(log n)
+    - Validaciones: O(n) → O(1) - tabla hash
     - Operaciones complejas 10x más rápidas
     """
     
@@ -45,28 +110,58 @@ class LibraryService:
         
         # Índices múltiples para búsquedas avanzadas
         self.book_indexes = IndexTree()
-        self.book_indexes.create_index('title')      # Búsqueda por título
-        self.book_indexes.create_index('author')     # Búsqueda por autor
-        self.book_indexes.create_index('year')       # Búsqueda por año
-        self.book_indexes.create_index('popularity') # Ranking de popularidad
+        self.book_indexes.create_index('title', 'prefix')   # Autocompletado por título
+        self.book_indexes.create_index('author', 'prefix')  # Autocompletado por autor
+        self.book_indexes.create_index('year', 'hash')      # Búsqueda exacta por año
+        self.book_indexes.create_index('popularity')        # Ranking de popularidad
         
         # Índices para usuarios
         self.user_indexes = IndexTree()
-        self.user_indexes.create_index('name')       # Búsqueda por nombre
-        self.user_indexes.create_index('email')      # Búsqueda por email
-        self.user_indexes.create_index('activity')   # Ranking de actividad
+        self.user_indexes.create_index('name', 'prefix')    # Autocompletado por nombre
+        self.user_indexes.create_index('email', 'prefix')   # Autocompletado por email
+        self.user_indexes.create_index('activity')          # Ranking de actividad
+        
+        # TABLAS HASH para búsquedas puntuales
+        # ====================================
+        # Los BST se mantienen para los recorridos ordenados; las búsquedas
+        # exactas por clave usan dict: O(1) promedio en C vs O(log n) en Python
+        self.books_by_isbn = {}
+        self.users_by_id = {}
+        
+        # Libros con copias disponibles: isbn -> Book
+        # Solo cambia cuando un libro pasa de 0 a 1 copia disponible o viceversa
+        self._available_books = {}
+        
+        # Claves de ranking con que cada elemento está en su índice
+        # Los puntajes cambian con el tiempo: se borra siempre con la clave
+        # insertada y se evita reindexar si la clave no cambió
+        self._popularity_keys = {}  # isbn -> clave en 'popularity'
+        self._activity_keys = {}    # user_id -> clave en 'activity'
         
         # ESTRUCTURAS LINEALES COMPLEMENTARIAS
         # ====================================
         
         # PILA para historial de operaciones del sistema
-        self.operation_history = Stack()
+        # Acotada: memoria fija, se descartan las operaciones más antiguas
+        self.operation_history = Stack(OPERATION_HISTORY_LIMIT)
         
         # COLA para notificaciones del sistema
         self.notifications = Queue()
         
-        # ARREGLO DINÁMICO para préstamos activos
-        self.active_loans = DynamicArray()
+        # COLECCIÓN INDEXADA para préstamos activos: clave (user_id, isbn)
+        # La devolución elimina el préstamo en O(1) sin recorrer la lista
+        self.active_loans = IndexedCollection()
+        
+        # Versión de los datos: se incrementa en cada operación que los modifica
+        # Permite a las capas superiores invalidar cachés en O(1)
+        self.version = 0
+        
+        # CONTADORES INCREMENTALES para estadísticas
+        # Se actualizan en cada alta/baja/préstamo/devolución: las
+        # estadísticas se leen en O(1) sin recorrer libros ni usuarios
+        self._total_copies = 0
+        self._available_copies = 0
+        self._active_users = 0      # Usuarios con al menos un libro prestado
         
         # Cargar datos de ejemplo
         self._load_sample_data()
@@ -105,80 +200,76 @@ class LibraryService:
         Agregar libro a todas las estructuras de datos
         Complejidad: O(log n) por cada inserción en BST
         """
-        # Insertar en BST principal por ISBN
+        # Insertar en BST principal por ISBN y en la tabla hash
         self.books_tree.insert(book.isbn, book)
+        self.books_by_isbn[book.isbn] = book
+        self._total_copies += book.total_copies
+        self._available_copies += book.available_copies
+        if book.available_copies > 0:
+            self._available_books[book.isbn] = book
         
         # Insertar en índices múltiples
-        key_extractors = {
-            'title': lambda b: b.title.lower(),
-            'author': lambda b: b.author.lower(),
-            'year': lambda b: str(b.year),
-            'popularity': lambda b: f"{b.get_popularity_score():010.2f}_{b.isbn}"
-        }
-        self.book_indexes.insert(book, key_extractors)
+        self.book_indexes.insert(book, _BOOK_KEY_EXTRACTORS)
+        rank_key = self._popularity_keys[book.isbn] = _popularity_key(book)
+        self.book_indexes.insert_key('popularity', rank_key, book)
         
         # Registrar operación
-        self.operation_history.push({
-            'action': 'add_book',
-            'isbn': book.isbn,
-            'title': book.title,
-            'timestamp': datetime.now()
-        })
+        self.operation_history.push(OperationRecord(
+            'add_book', None, book.isbn, book.title, book.created_at))
     
     def _add_user_to_trees(self, user: User):
         """
         Agregar usuario a todas las estructuras de datos
         Complejidad: O(log n) por cada inserción en BST
         """
-        # Insertar en BST principal por user_id
+        # Insertar en BST principal por user_id y en la tabla hash
         self.users_tree.insert(user.user_id, user)
+        self.users_by_id[user.user_id] = user
         
         # Insertar en índices múltiples
-        key_extractors = {
-            'name': lambda u: u.name.lower(),
-            'email': lambda u: u.email.lower(),
-            'activity': lambda u: f"{u.get_activity_score():010.2f}_{u.user_id}"
-        }
-        self.user_indexes.insert(user, key_extractors)
+        self.user_indexes.insert(user, _USER_KEY_EXTRACTORS)
+        rank_key = self._activity_keys[user.user_id] = _activity_key(user)
+        self.user_indexes.insert_key('activity', rank_key, user)
         
         # Registrar operación
-        self.operation_history.push({
-            'action': 'add_user',
-            'user_id': user.user_id,
-            'name': user.name,
-            'timestamp': datetime.now()
-        })
+        self.operation_history.push(OperationRecord(
+            'add_user', user.user_id, None, user.name, user.registration_date))
     
     # ==================== GESTIÓN DE LIBROS ====================
     
-    def add_book(self, isbn: str, title: str, author: str, year: int, copies: int = 1) -> bool:
+    def add_book(self, isbn: str, title: str, author: str, year: int, copies: int = 1) -> Optional[Book]:
         """
         Agregar libro al sistema
+        Retorna el libro agregado/actualizado, o None si hubo un error
         Complejidad: O(log n) - Búsqueda e inserción en BST
         """
         try:
-            # Verificar si ya existe (búsqueda O(log n))
-            existing_book = self.books_tree.search(isbn)
+            # Verificar si ya existe (búsqueda O(1))
+            book = self.books_by_isbn.get(isbn)
             
-            if existing_book:
+            if book:
                 # Actualizar copias del libro existente
-                existing_book.total_copies += copies
-                existing_book.available_copies += copies
+                book.total_copies += copies
+                book.available_copies += copies
+                self._total_copies += copies
+                self._available_copies += copies
+                self._available_books[isbn] = book
                 
                 # Actualizar índices
-                self._update_book_indexes(existing_book)
+                self._update_book_indexes(book)
             else:
                 # Crear nuevo libro
-                new_book = Book(isbn, title, author, year, copies)
-                self._add_book_to_trees(new_book)
+                book = Book(isbn, title, author, year, copies)
+                self._add_book_to_trees(book)
             
             # Notificación
-            self.notifications.enqueue(f"📚 Libro agregado: {title}")
-            return True
+            self.notifications.enqueue(_MSG_ADD_BOOK + title)
+            self.version += 1
+            return book
             
         except Exception as e:
             print(f"Error al agregar libro: {e}")
-            return False
+            return None
     
     def remove_book(self, isbn: str) -> bool:
         """
@@ -186,31 +277,28 @@ class LibraryService:
         Complejidad: O(log n) - Búsqueda y eliminación en BST
         """
         try:
-            # Buscar libro (O(log n))
-            book = self.books_tree.search(isbn)
+            # Buscar libro (O(1))
+            book = self.books_by_isbn.get(isbn)
             
-            if book and book.available_copies == book.total_copies:
-                # Eliminar de BST principal
+            if book and book.is_fully_available():
+                # Eliminar de BST principal y de la tabla hash
                 self.books_tree.delete(isbn)
+                del self.books_by_isbn[isbn]
+                self._total_copies -= book.total_copies
+                self._available_copies -= book.available_copies
+                self._available_books.pop(isbn, None)
                 
                 # Eliminar de índices múltiples
-                key_extractors = {
-                    'title': lambda b: b.title.lower(),
-                    'author': lambda b: b.author.lower(),
-                    'year': lambda b: str(b.year),
-                    'popularity': lambda b: f"{b.get_popularity_score():010.2f}_{b.isbn}"
-                }
-                self.book_indexes.delete(book, key_extractors)
+                self.book_indexes.delete(book, _BOOK_KEY_EXTRACTORS)
+                self.book_indexes.delete_key(
+                    'popularity', self._popularity_keys.pop(isbn), book)
                 
                 # Registrar operación
-                self.operation_history.push({
-                    'action': 'remove_book',
-                    'isbn': isbn,
-                    'title': book.title,
-                    'timestamp': datetime.now()
-                })
+                self.operation_history.push(OperationRecord(
+                    'remove_book', None, isbn, book.title, datetime.now()))
                 
-                self.notifications.enqueue(f"🗑️ Libro eliminado: {book.title}")
+                self.notifications.enqueue(_MSG_REMOVE_BOOK + book.title)
+                self.version += 1
                 return True
             
             return False
@@ -225,30 +313,31 @@ class LibraryService:
         Complejidad: O(log n + k) donde k es número de resultados
         """
         try:
-            results = set()  # Usar set para evitar duplicados
+            # dict por ISBN: evita duplicados y conserva el orden de aparición
+            results = {}
             query_lower = query.lower()
             
             # Búsqueda por título (O(log n + k))
-            title_results = self.book_indexes.search_prefix_by_field('title', query_lower)
-            results.update(title_results)
+            for book in self.book_indexes.search_prefix_by_field('title', query_lower):
+                results[book.isbn] = book
             
             # Búsqueda por autor (O(log n + k))
-            author_results = self.book_indexes.search_prefix_by_field('author', query_lower)
-            results.update(author_results)
+            for book in self.book_indexes.search_prefix_by_field('author', query_lower):
+                results[book.isbn] = book
             
-            # Búsqueda por ISBN exacto (O(log n))
-            if query.replace('-', '').isdigit():
-                isbn_result = self.books_tree.search(query)
+            # Búsqueda por ISBN exacto (O(1)); sin copiar la consulta
+            if _ISBN_QUERY_RE.fullmatch(query):
+                isbn_result = self.books_by_isbn.get(query)
                 if isbn_result:
-                    results.add(isbn_result)
-            
-            # Búsqueda por año
-            if query.isdigit():
-                year_results = self.book_indexes.search_by_field('year', query)
-                if year_results:
-                    results.add(year_results)
+                    results[isbn_result.isbn] = isbn_result
+                
+                # Búsqueda por año (solo dígitos: subconjunto del caso anterior)
+                if query.isdigit():
+                    year_results = self.book_indexes.search_by_field('year', query)
+                    if year_results:
+                        results[year_results.isbn] = year_results
             
-            return list(results)
+            return list(results.values())
             
         except Exception as e:
             print(f"Error al buscar libros: {e}")
@@ -259,11 +348,16 @@ class LibraryService:
         Obtener todos los libros ordenados por ISBN
         Complejidad: O(n) - Recorrido in-order del BST
         """
-        try:
-            return self.books_tree.get_all_sorted()
-        except Exception as e:
-            print(f"Error al obtener libros: {e}")
-            return []
+        return self.books_tree.get_all_sorted()
+    
+    def get_available_books(self) -> List[Book]:
+        """
+        Obtener libros con copias disponibles, ordenados por ISBN
+        Complejidad: O(k log k) donde k es número de libros disponibles
+        (índice mantenido en préstamos/devoluciones, sin recorrer el catálogo)
+        """
+        available = self._available_books
+        return [available[isbn] for isbn in sorted(available)]
     
     def get_books_by_popularity(self) -> List[Book]:
         """
@@ -279,51 +373,48 @@ class LibraryService:
     def get_book(self, isbn: str) -> Optional[Book]:
         """
         Obtener libro por ISBN
-        Complejidad: O(log n) - Búsqueda en BST
+        Complejidad: O(1) - Búsqueda en tabla hash
         """
-        try:
-            return self.books_tree.search(isbn)
-        except Exception as e:
-            print(f"Error al obtener libro: {e}")
-            return None
+        return self.books_by_isbn.get(isbn)
     
     def _update_book_indexes(self, book: Book):
-        """Actualizar índices cuando cambian los datos del libro"""
-        # Eliminar de índices
-        key_extractors = {
-            'title': lambda b: b.title.lower(),
-            'author': lambda b: b.author.lower(),
-            'year': lambda b: str(b.year),
-            'popularity': lambda b: f"{b.get_popularity_score():010.2f}_{b.isbn}"
-        }
-        self.book_indexes.delete(book, key_extractors)
-        
-        # Reinsertar con datos actualizados
-        self.book_indexes.insert(book, key_extractors)
+        """
+        Actualizar el ranking cuando cambian copias o préstamos del libro
+        Título, autor y año no cambian: solo se reubica la popularidad,
+        y únicamente si su clave cambió
+        """
+        new_key = _popularity_key(book)
+        old_key = self._popularity_keys[book.isbn]
+        if new_key != old_key:
+            self.book_indexes.delete_key('popularity', old_key, book)
+            self.book_indexes.insert_key('popularity', new_key, book)
+            self._popularity_keys[book.isbn] = new_key
     
     # ==================== GESTIÓN DE USUARIOS ====================
     
-    def add_user(self, user_id: str, name: str, email: str) -> bool:
+    def add_user(self, user_id: str, name: str, email: str) -> Optional[User]:
         """
         Agregar usuario al sistema
+        Retorna el usuario creado, o None si el ID ya existe o hubo un error
         Complejidad: O(log n) - Búsqueda e inserción en BST
         """
         try:
-            # Verificar si ya existe (O(log n))
-            existing_user = self.users_tree.search(user_id)
+            # Verificar si ya existe (O(1))
+            existing_user = self.users_by_id.get(user_id)
             
             if not existing_user:
                 new_user = User(user_id, name, email)
                 self._add_user_to_trees(new_user)
                 
-                self.notifications.enqueue(f"👤 Usuario registrado: {name}")
-                return True
+                self.notifications.enqueue(_MSG_ADD_USER + name)
+                self.version += 1
+                return new_user
             
-            return False
+            return None
             
         except Exception as e:
             print(f"Error al agregar usuario: {e}")
-            return False
+            return None
     
     def remove_user(self, user_id: str) -> bool:
         """
@@ -331,30 +422,25 @@ class LibraryService:
         Complejidad: O(log n) - Búsqueda y eliminación en BST
         """
         try:
-            # Buscar usuario (O(log n))
-            user = self.users_tree.search(user_id)
+            # Buscar usuario (O(1))
+            user = self.users_by_id.get(user_id)
             
             if user and len(user.borrowed_books) == 0:
-                # Eliminar de BST principal
+                # Eliminar de BST principal y de la tabla hash
                 self.users_tree.delete(user_id)
+                del self.users_by_id[user_id]
                 
                 # Eliminar de índices múltiples
-                key_extractors = {
-                    'name': lambda u: u.name.lower(),
-                    'email': lambda u: u.email.lower(),
-                    'activity': lambda u: f"{u.get_activity_score():010.2f}_{u.user_id}"
-                }
-                self.user_indexes.delete(user, key_extractors)
+                self.user_indexes.delete(user, _USER_KEY_EXTRACTORS)
+                self.user_indexes.delete_key(
+                    'activity', self._activity_keys.pop(user_id), user)
                 
                 # Registrar operación
-                self.operation_history.push({
-                    'action': 'remove_user',
-                    'user_id': user_id,
-                    'name': user.name,
-                    'timestamp': datetime.now()
-                })
+                self.operation_history.push(OperationRecord(
+                    'remove_user', user_id, None, user.name, datetime.now()))
                 
-                self.notifications.enqueue(f"🗑️ Usuario eliminado: {user.name}")
+                self.notifications.enqueue(_MSG_REMOVE_USER + user.name)
+                self.version += 1
                 return True
             
             return False
@@ -368,11 +454,7 @@ class LibraryService:
         Obtener todos los usuarios ordenados por ID
         Complejidad: O(n) - Recorrido in-order del BST
         """
-        try:
-            return self.users_tree.get_all_sorted()
-        except Exception as e:
-            print(f"Error al obtener usuarios: {e}")
-            return []
+        return self.users_tree.get_all_sorted()
     
     def get_users_by_activity(self) -> List[User]:
         """
@@ -388,13 +470,9 @@ class LibraryService:
     def get_user(self, user_id: str) -> Optional[User]:
         """
         Obtener usuario por ID
-        Complejidad: O(log n) - Búsqueda en BST
+        Complejidad: O(1) - Búsqueda en tabla hash
         """
-        try:
-            return self.users_tree.search(user_id)
-        except Exception as e:
-            print(f"Error al obtener usuario: {e}")
-            return None
+        return self.users_by_id.get(user_id)
     
     def search_users(self, query: str) -> List[User]:
         """
@@ -402,23 +480,24 @@ class LibraryService:
         Complejidad: O(log n + k) donde k es número de resultados
         """
         try:
-            results = set()
+            # dict por user_id: evita duplicados y conserva el orden de aparición
+            results = {}
             query_lower = query.lower()
             
             # Búsqueda por nombre
-            name_results = self.user_indexes.search_prefix_by_field('name', query_lower)
-            results.update(name_results)
+            for user in self.user_indexes.search_prefix_by_field('name', query_lower):
+                results[user.user_id] = user
             
             # Búsqueda por email
-            email_results = self.user_indexes.search_prefix_by_field('email', query_lower)
-            results.update(email_results)
+            for user in self.user_indexes.search_prefix_by_field('email', query_lower):
+                results[user.user_id] = user
             
             # Búsqueda por ID exacto
-            id_result = self.users_tree.search(query)
+            id_result = self.users_by_id.get(query)
             if id_result:
-                results.add(id_result)
+                results[id_result.user_id] = id_result
             
-            return list(results)
+            return list(results.values())
             
         except Exception as e:
             print(f"Error al buscar usuarios: {e}")
@@ -429,12 +508,12 @@ class LibraryService:
     def borrow_book(self, user_id: str, isbn: str) -> Tuple[bool, str]:
         """
         Prestar libro a usuario
-        Complejidad: O(log n) - Búsquedas en BST + O(1) operaciones
+        Complejidad: O(1) búsquedas en tablas hash + O(log n) actualización de índices
         """
         try:
-            # Búsquedas eficientes en BST (O(log n) cada una)
-            user = self.users_tree.search(user_id)
-            book = self.books_tree.search(isbn)
+            # Búsquedas en tablas hash (O(1) cada una)
+            user = self.users_by_id.get(user_id)
+            book = self.books_by_isbn.get(isbn)
             
             if not user:
                 return False, "Usuario no encontrado"
@@ -451,34 +530,21 @@ class LibraryService:
             if not user.can_borrow_more():
                 return False, "El usuario ha alcanzado el límite de libros"
             
-            # Realizar préstamo
-            if book.borrow(user_id) and user.borrow_book(isbn):
-                # Agregar a préstamos activos
-                loan_record = {
-                    'user_id': user_id,
-                    'isbn': isbn,
-                    'user_name': user.name,
-                    'book_title': book.title,
-                    'loan_date': datetime.now()
-                }
-                self.active_loans.append(loan_record)
-                
-                # Actualizar índices (popularidad del libro, actividad del usuario)
-                self._update_book_indexes(book)
-                self._update_user_indexes(user)
-                
-                # Registrar operación
-                self.operation_history.push({
-                    'action': 'borrow_book',
-                    'user_id': user_id,
-                    'isbn': isbn,
-                    'timestamp': datetime.now()
-                })
-                
-                self.notifications.enqueue(f"📤 Préstamo: {book.title} → {user.name}")
-                return True, "Libro prestado exitosamente"
+            # Realizar préstamo (una sola lectura del reloj para toda la operación)
+            now = datetime.now()
+            self._apply_loan(user, book, now)
             
-            return False, "Error al procesar el préstamo"
+            # Actualizar índices (popularidad del libro, actividad del usuario)
+            self._update_book_indexes(book)
+            self._update_user_indexes(user)
+            
+            # Registrar operación
+            self.operation_history.push(OperationRecord(
+                'borrow_book', user_id, isbn, None, now))
+            
+            self.notifications.enqueue(_MSG_BORROW + book.title + " → " + user.name)
+            self.version += 1
+            return True, "Libro prestado exitosamente"
             
         except Exception as e:
             print(f"Error al prestar libro: {e}")
@@ -487,12 +553,12 @@ class LibraryService:
     def return_book(self, user_id: str, isbn: str) -> Tuple[bool, str]:
         """
         Devolver libro prestado
-        Complejidad: O(log n) - Búsquedas en BST + O(n) búsqueda en préstamos activos
+        Complejidad: O(1) búsquedas en tablas hash + O(log n) actualización de índices
         """
         try:
-            # Búsquedas eficientes en BST
-            user = self.users_tree.search(user_id)
-            book = self.books_tree.search(isbn)
+            # Búsquedas en tablas hash (O(1) cada una)
+            user = self.users_by_id.get(user_id)
+            book = self.books_by_isbn.get(isbn)
             
             if not user:
                 return False, "Usuario no encontrado"
@@ -500,108 +566,120 @@ class LibraryService:
             if not book:
                 return False, "Libro no encontrado"
             
-            if not user.has_book(isbn):
+            # Realizar devolución (una sola lectura del reloj para toda la operación)
+            # La baja en el usuario verifica y elimina en un solo paso
+            now = datetime.now()
+            if not user.return_book(isbn, now):
                 return False, "El usuario no tiene este libro prestado"
+            self._apply_return(user, book, now)
             
-            # Realizar devolución
-            if book.return_book(user_id) and user.return_book(isbn):
-                # Remover de préstamos activos
-                for i in range(len(self.active_loans)):
-                    loan = self.active_loans.get(i)
-                    if loan['user_id'] == user_id and loan['isbn'] == isbn:
-                        self.active_loans.remove_at(i)
-                        break
-                
-                # Actualizar índices
-                self._update_book_indexes(book)
-                self._update_user_indexes(user)
-                
-                # Registrar operación
-                self.operation_history.push({
-                    'action': 'return_book',
-                    'user_id': user_id,
-                    'isbn': isbn,
-                    'timestamp': datetime.now()
-                })
-                
-                self.notifications.enqueue(f"📥 Devolución: {book.title} ← {user.name}")
-                return True, "Libro devuelto exitosamente"
+            # Actualizar índices
+            self._update_book_indexes(book)
+            self._update_user_indexes(user)
+            
+            # Registrar operación
+            self.operation_history.push(OperationRecord(
+                'return_book', user_id, isbn, None, now))
             
-            return False, "Error al procesar la devolución"
+            self.notifications.enqueue(_MSG_RETURN + book.title + " ← " + user.name)
+            self.version += 1
+            return True, "Libro devuelto exitosamente"
             
         except Exception as e:
             print(f"Error al devolver libro: {e}")
             return False, f"Error inesperado: {e}"
     
+    def _apply_loan(self, user: User, book: Book, now: datetime):
+        """
+        Aplicar un préstamo ya validado en una sola pasada:
+        libro, usuario, contadores y préstamos activos
+        """
+        user_id = user.user_id
+        isbn = book.isbn
+        book.borrow(user_id, now)
+        user.borrow_book(isbn, now)
+        
+        self._available_copies -= 1
+        if book.available_copies == 0:
+            del self._available_books[isbn]
+        if len(user.borrowed_books) == 1:
+            self._active_users += 1
+        
+        self.active_loans.append({
+            'user_id': user_id,
+            'isbn': isbn,
+            'user_name': user.name,
+            'book_title': book.title,
+            'loan_date': now
+        }, (user_id, isbn))
+    
+    def _apply_return(self, user: User, book: Book, now: datetime):
+        """
+        Aplicar la devolución en el libro, contadores y préstamos activos
+        (el usuario ya registró la baja)
+        """
+        book.return_book(user.user_id, now)
+        
+        self._available_copies += 1
+        if book.available_copies == 1:
+            self._available_books[book.isbn] = book
+        if len(user.borrowed_books) == 0:
+            self._active_users -= 1
+        
+        self.active_loans.remove((user.user_id, book.isbn))
+    
     def get_user_borrowed_books(self, user_id: str) -> List[Book]:
         """
         Obtener libros prestados por un usuario
-        Complejidad: O(log n + k) donde k es número de libros prestados
+        Complejidad: O(k) donde k es número de libros prestados
         """
         try:
-            user = self.users_tree.search(user_id)  # O(log n)
+            user = self.users_by_id.get(user_id)  # O(1)
             if not user:
                 return []
             
-            borrowed_books = []
-            for isbn in user.get_borrowed_books_list():  # O(k)
-                book = self.books_tree.search(isbn)  # O(log n) por libro
-                if book:
-                    borrowed_books.append(book)
-            
-            return borrowed_books
+            # Una consulta O(1) en la tabla hash por ISBN, sin copiar la colección
+            books_by_isbn = self.books_by_isbn
+            return [books_by_isbn[isbn] for isbn in user.borrowed_books
+                    if isbn in books_by_isbn]
             
         except Exception as e:
             print(f"Error al obtener libros prestados: {e}")
             return []
     
     def _update_user_indexes(self, user: User):
-        """Actualizar índices cuando cambian los datos del usuario"""
-        key_extractors = {
-            'name': lambda u: u.name.lower(),
-            'email': lambda u: u.email.lower(),
-            'activity': lambda u: f"{u.get_activity_score():010.2f}_{u.user_id}"
-        }
-        self.user_indexes.delete(user, key_extractors)
-        self.user_indexes.insert(user, key_extractors)
+        """
+        Actualizar el ranking cuando cambia la actividad del usuario
+        Nombre y email no cambian: solo se reubica la actividad si su clave cambió
+        """
+        new_key = _activity_key(user)
+        old_key = self._activity_keys[user.user_id]
+        if new_key != old_key:
+            self.user_indexes.delete_key('activity', old_key, user)
+            self.user_indexes.insert_key('activity', new_key, user)
+            self._activity_keys[user.user_id] = new_key
     
     # ==================== REPORTES Y ESTADÍSTICAS ====================
     
     def get_active_loans(self) -> List[dict]:
         """Obtener todos los préstamos activos"""
-        try:
-            return self.active_loans.to_list()
-        except Exception as e:
-            print(f"Error al obtener préstamos activos: {e}")
-            return []
+        return self.active_loans.to_list()
     
     def get_operation_history(self, limit: int = 10) -> List[dict]:
         """Obtener historial de operaciones (más recientes primero)"""
-        try:
-            history = self.operation_history.to_list()
-            return history[:limit]
-        except Exception as e:
-            print(f"Error al obtener historial: {e}")
-            return []
+        return [record.to_dict() for record in self.operation_history.peek_recent(limit)]
     
     def get_notifications(self) -> List[str]:
         """Obtener y limpiar notificaciones pendientes"""
-        try:
-            notifications = []
-            while not self.notifications.is_empty():
-                notifications.append(self.notifications.dequeue())
-            return notifications
-        except Exception as e:
-            print(f"Error al obtener notificaciones: {e}")
-            return []
+        return self.notifications.drain()
     
     def get_most_borrowed_books(self, limit: int = 10) -> List[Tuple[Book, int]]:
         """
         Obtener libros más prestados usando índice de popularidad
-        Complejidad: O(n) - Recorrido ordenado del índice
+        Complejidad: O(h + limit) - Recorrido inverso parcial del índice
         """
         try:
-            popular_books = self.get_books_by_popularity()[:limit]
+            popular_books = self.book_indexes.get_top_by_field('popularity', limit)
             return [(book, book.get_times_borrowed()) for book in popular_books]
         except Exception as e:
             print(f"Error al obtener libros más prestados: {e}")
@@ -610,46 +688,38 @@ class LibraryService:
     def get_most_active_users(self, limit: int = 10) -> List[Tuple[User, float]]:
         """
         Obtener usuarios más activos usando índice de actividad
-        Complejidad: O(n) - Recorrido ordenado del índice
+        Complejidad: O(h + limit) - Recorrido inverso parcial del índice
         """
         try:
-            active_users = self.get_users_by_activity()[:limit]
+            active_users = self.user_indexes.get_top_by_field('activity', limit)
             return [(user, user.get_activity_score()) for user in active_users]
         except Exception as e:
             print(f"Error al obtener usuarios más activos: {e}")
             return []
     
     def get_general_statistics(self) -> dict:
-        """Obtener estadísticas generales del sistema"""
-        try:
-            books = self.get_all_books()
-            users = self.get_all_users()
-            
-            total_books = len(books)
-            total_copies = sum(book.total_copies for book in books)
-            available_copies = sum(book.available_copies for book in books)
-            borrowed_copies = total_copies - available_copies
-            total_users = len(users)
-            active_users = len([user for user in users if len(user.borrowed_books) > 0])
-            
-            utilization = (borrowed_copies / total_copies * 100) if total_copies > 0 else 0
-            
-            return {
-                'total_books': total_books,
-                'total_copies': total_copies,
-                'available_copies': available_copies,
-                'borrowed_copies': borrowed_copies,
-                'total_users': total_users,
-                'active_users': active_users,
-                'utilization_rate': utilization,
-                'tree_sizes': {
-                    'books_tree': len(self.books_tree),
-                    'users_tree': len(self.users_tree)
-                }
+        """
+        Obtener estadísticas generales del sistema
+        Se arman a partir de los contadores incrementales, sin recorridos
+        Complejidad: O(1)
+        """
+        total_copies = self._total_copies
+        borrowed_copies = total_copies - self._available_copies
+        utilization = (borrowed_copies / total_copies * 100) if total_copies > 0 else 0
+        
+        return {
+            'total_books': len(self.books_by_isbn),
+            'total_copies': total_copies,
+            'available_copies': self._available_copies,
+            'borrowed_copies': borrowed_copies,
+            'total_users': len(self.users_by_id),
+            'active_users': self._active_users,
+            'utilization_rate': utilization,
+            'tree_sizes': {
+                'books_tree': len(self.books_tree),
+                'users_tree': len(self.users_tree)
             }
-        except Exception as e:
-            print(f"Error al obtener estadísticas: {e}")
-            return {}
+        }
     
     # ==================== API PARA FRONTEND ====================
     
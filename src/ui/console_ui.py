@@ -1,11 +1,111 @@
+import heapq
 from typing import List
 from src.services.library_service import LibraryService
 from src.models.book import Book
 from src.models.user import User
 
+_SEP = "=" * 60
+
+_ACTION_ICONS = {
+    'add_book': '📚➕',
+    'remove_book': '📚🗑️',
+    'add_user': '👤➕',
+    'remove_user': '👤🗑️',
+    'borrow_book': '📤',
+    'return_book': '📥'
+}
+_BOOK_ACTIONS = frozenset({'add_book', 'remove_book'})
+_USER_ACTIONS = frozenset({'add_user', 'remove_user'})
+_LOAN_ACTIONS = frozenset({'borrow_book', 'return_book'})
+
+def _header(title: str) -> str:
+    return f"{_SEP}\n {title:^58} \n{_SEP}"
+
+def _menu(title: str, *options: str) -> str:
+    # Bloque completo del menú (encabezado, opciones y línea en blanco)
+    return "\n".join((_header(title),) + options + ("",))
+
+# Los menús son estáticos: se arman una vez y se imprimen con una sola llamada
+_MAIN_MENU = _menu(
+    "📚 SISTEMA DE GESTIÓN DE BIBLIOTECA 📚",
+    "📖 1. Gestión de Libros",
+    "👥 2. Gestión de Usuarios",
+    "🔄 3. Gestión de Préstamos",
+    "📊 4. Reportes",
+    "🚪 5. Salir",
+)
+
+_BOOKS_MENU = _menu(
+    "📖 GESTIÓN DE LIBROS 📖",
+    "📚 1. Ver todos los libros",
+    "🔍 2. Buscar libros",
+    "➕ 3. Agregar libro",
+    "🗑️  4. Eliminar libro",
+    "⬅️  5. Volver al menú principal",
+)
+
+_USERS_MENU = _menu(
+    "👥 GESTIÓN DE USUARIOS 👥",
+    "👤 1. Ver todos los usuarios",
+    "➕ 2. Agregar usuario",
+    "🗑️  3. Eliminar usuario",
+    "📚 4. Ver libros prestados por usuario",
+    "⬅️  5. Volver al menú principal",
+)
+
+_LOANS_MENU = _menu(
+    "🔄 GESTIÓN DE PRÉSTAMOS 🔄",
+    "📤 1. Prestar libro",
+    "📥 2. Devolver libro",
+    "📋 3. Ver préstamos activos",
+    "⬅️  4. Volver al menú principal",
+)
+
+_REPORTS_MENU = _menu(
+    "📊 REPORTES 📊",
+    "🏆 1. Libros más prestados",
+    "⭐ 2. Usuarios más activos",
+    "📈 3. Estadísticas generales",
+    "📋 4. Historial de operaciones",
+    "🔔 5. Ver notificaciones",
+    "⬅️  6. Volver al menú principal",
+)
+
 class ConsoleUI:
     def __init__(self):
         self.library_service = LibraryService()
+        
+        # Tablas de despacho de cada menú: opción -> acción
+        self._main_actions = {
+            "1": self.show_books_menu,
+            "2": self.show_users_menu,
+            "3": self.show_loans_menu,
+            "4": self.show_reports_menu,
+        }
+        self._books_actions = {
+            "1": self.show_all_books,
+            "2": self.search_books,
+            "3": self.add_book,
+            "4": self.remove_book,
+        }
+        self._users_actions = {
+            "1": self.show_all_users,
+            "2": self.add_user,
+            "3": self.remove_user,
+            "4": self.show_user_books,
+        }
+        self._loans_actions = {
+            "1": self.borrow_book,
+            "2": self.return_book,
+            "3": self.show_active_loans,
+        }
+        self._reports_actions = {
+            "1": self.show_most_borrowed_books,
+            "2": self.show_most_active_users,
+            "3": self.show_general_stats,
+            "4": self.show_operation_history,
+            "5": self.show_notifications,
+        }
     
     def clear_screen(self):
         # Simular limpieza de pantalla con líneas en blanco
@@ -15,27 +115,26 @@ class ConsoleUI:
         input("\nPresiona Enter para continuar...")
     
     def print_header(self, title: str):
-        print("=" * 60)
-        print(f" {title.center(58)} ")
-        print("=" * 60)
+        print(_header(title))
     
     def print_books(self, books: List[Book], title: str = "Libros"):
-        self.print_header(title)
+        # Armar el listado completo y escribirlo con una sola llamada
+        lines = [_header(title)]
         if not books:
-            print("No se encontraron libros.")
+            lines.append("No se encontraron libros.")
         else:
-            for i, book in enumerate(books, 1):
-                print(f"{i:2d}. {book}")
-        print()
+            lines.extend(f"{i:2d}. {book}" for i, book in enumerate(books, 1))
+        lines.append("")
+        print("\n".join(lines))
     
     def print_users(self, users: List[User], title: str = "Usuarios"):
-        self.print_header(title)
+        lines = [_header(title)]
         if not users:
-            print("No se encontraron usuarios.")
+            lines.append("No se encontraron usuarios.")
         else:
-            for i, user in enumerate(users, 1):
-                print(f"{i:2d}. {user}")
-        print()
+            lines.extend(f"{i:2d}. {user}" for i, user in enumerate(users, 1))
+        lines.append("")
+        print("\n".join(lines))
     
     def get_input(self, prompt: str, required: bool = True) -> str:
         while True:
@@ -46,46 +145,32 @@ class ConsoleUI:
     
     def get_int_input(self, prompt: str, min_val: int = 0) -> int:
         while True:
-            try:
-                value = int(input(prompt))
-                if value >= min_val:
-                    return value
-                print(f"El valor debe ser mayor o igual a {min_val}")
-            except ValueError:
+            # Validar antes de convertir: la entrada inválida no lanza excepción
+            text = input(prompt).strip()
+            digits = text[1:] if text[:1] in ('+', '-') else text
+            if not digits.isdecimal():
                 print("Por favor, ingresa un número válido.")
+                continue
+            value = int(text)
+            if value >= min_val:
+                return value
+            print(f"El valor debe ser mayor o igual a {min_val}")
     
     def show_main_menu(self):
         self.clear_screen()
-        self.print_header("📚 SISTEMA DE GESTIÓN DE BIBLIOTECA 📚")
-        print("📖 1. Gestión de Libros")
-        print("👥 2. Gestión de Usuarios")
-        print("🔄 3. Gestión de Préstamos")
-        print("📊 4. Reportes")
-        print("🚪 5. Salir")
-        print()
+        print(_MAIN_MENU)
         return self.get_input("Selecciona una opción (1-5): ")
     
     def show_books_menu(self):
         while True:
             self.clear_screen()
-            self.print_header("📖 GESTIÓN DE LIBROS 📖")
-            print("📚 1. Ver todos los libros")
-            print("🔍 2. Buscar libros")
-            print("➕ 3. Agregar libro")
-            print("🗑️  4. Eliminar libro")
-            print("⬅️  5. Volver al menú principal")
-            print()
+            print(_BOOKS_MENU)
             
             option = self.get_input("Selecciona una opción (1-5): ")
             
-            if option == "1":
-                self.show_all_books()
-            elif option == "2":
-                self.search_books()
-            elif option == "3":
-                self.add_book()
-            elif option == "4":
-                self.remove_book()
+            action = self._books_actions.get(option)
+            if action:
+                action()
             elif option == "5":
                 break
             else:
@@ -138,7 +223,7 @@ class ConsoleUI:
         
         if not book:
             print("❌ Libro no encontrado.")
-        elif book.available_copies != book.total_copies:
+        elif not book.is_fully_available():
             print("⚠️ No se puede eliminar el libro porque tiene copias prestadas.")
         else:
             confirm = self.get_input(f"¿Estás seguro de eliminar '{book.title}'? (s/N): ")
@@ -155,24 +240,13 @@ class ConsoleUI:
     def show_users_menu(self):
         while True:
             self.clear_screen()
-            self.print_header("👥 GESTIÓN DE USUARIOS 👥")
-            print("👤 1. Ver todos los usuarios")
-            print("➕ 2. Agregar usuario")
-            print("🗑️  3. Eliminar usuario")
-            print("📚 4. Ver libros prestados por usuario")
-            print("⬅️  5. Volver al menú principal")
-            print()
+            print(_USERS_MENU)
             
             option = self.get_input("Selecciona una opción (1-5): ")
             
-            if option == "1":
-                self.show_all_users()
-            elif option == "2":
-                self.add_user()
-            elif option == "3":
-                self.remove_user()
-            elif option == "4":
-                self.show_user_books()
+            action = self._users_actions.get(option)
+            if action:
+                action()
             elif option == "5":
                 break
             else:
@@ -214,7 +288,7 @@ class ConsoleUI:
         
         if not user:
             print("❌ Usuario no encontrado.")
-        elif len(user.borrowed_books) > 0:
+        elif user.borrowed_books:
             print("⚠️ No se puede eliminar el usuario porque tiene libros prestados.")
         else:
             confirm = self.get_input(f"¿Estás seguro de eliminar a '{user.name}'? (s/N): ")
@@ -247,21 +321,13 @@ class ConsoleUI:
     def show_loans_menu(self):
         while True:
             self.clear_screen()
-            self.print_header("🔄 GESTIÓN DE PRÉSTAMOS 🔄")
-            print("📤 1. Prestar libro")
-            print("📥 2. Devolver libro")
-            print("📋 3. Ver préstamos activos")
-            print("⬅️  4. Volver al menú principal")
-            print()
+            print(_LOANS_MENU)
             
             option = self.get_input("Selecciona una opción (1-4): ")
             
-            if option == "1":
-                self.borrow_book()
-            elif option == "2":
-                self.return_book()
-            elif option == "3":
-                self.show_active_loans()
+            action = self._loans_actions.get(option)
+            if action:
+                action()
             elif option == "4":
                 break
             else:
@@ -273,7 +339,7 @@ class ConsoleUI:
         self.print_header("📤 PRESTAR LIBRO 📤")
         
         # Mostrar libros disponibles
-        available_books = [book for book in self.library_service.get_all_books() if book.is_available()]
+        available_books = self.library_service.get_available_books()
         if not available_books:
             print("❌ No hay libros disponibles para préstamo.")
             self.pause()
@@ -328,20 +394,15 @@ class ConsoleUI:
         self.clear_screen()
         self.print_header("📋 PRÉSTAMOS ACTIVOS 📋")
         
-        users = self.library_service.get_all_users()
-        active_loans = []
+        # Una sola consulta al servicio; agrupados por usuario (orden estable)
+        loans = sorted(self.library_service.get_active_loans(), key=lambda loan: loan['user_id'])
         
-        for user in users:
-            if user.borrowed_books:
-                borrowed_books = self.library_service.get_user_borrowed_books(user.user_id)
-                for book in borrowed_books:
-                    active_loans.append(f"{user.name} ({user.user_id}) - {book.title}")
-        
-        if not active_loans:
+        if not loans:
             print("ℹ️ No hay préstamos activos.")
         else:
-            for i, loan in enumerate(active_loans, 1):
-                print(f"📖 {i:2d}. {loan}")
+            print("\n".join(
+                f"📖 {i:2d}. {loan['user_name']} ({loan['user_id']}) - {loan['book_title']}"
+                for i, loan in enumerate(loans, 1)))
         
         print()
         self.pause()
@@ -349,27 +410,13 @@ class ConsoleUI:
     def show_reports_menu(self):
         while True:
             self.clear_screen()
-            self.print_header("📊 REPORTES 📊")
-            print("🏆 1. Libros más prestados")
-            print("⭐ 2. Usuarios más activos")
-            print("📈 3. Estadísticas generales")
-            print("📋 4. Historial de operaciones")
-            print("🔔 5. Ver notificaciones")
-            print("⬅️  6. Volver al menú principal")
-            print()
+            print(_REPORTS_MENU)
             
             option = self.get_input("Selecciona una opción (1-6): ")
             
-            if option == "1":
-                self.show_most_borrowed_books()
-            elif option == "2":
-                self.show_most_active_users()
-            elif option == "3":
-                self.show_general_stats()
-            elif option == "4":
-                self.show_operation_history()
-            elif option == "5":
-                self.show_notifications()
+            action = self._reports_actions.get(option)
+            if action:
+                action()
             elif option == "6":
                 break
             else:
@@ -381,14 +428,16 @@ class ConsoleUI:
         self.print_header("🏆 LIBROS MÁS PRESTADOS 🏆")
         
         books = self.library_service.get_all_books()
-        borrowed_books = [(book, len(book.borrowed_by)) for book in books if book.borrowed_by]
-        borrowed_books.sort(key=lambda x: x[1], reverse=True)
+        # Solo los 10 primeros: O(n log 10) en lugar de ordenar todo el catálogo
+        borrowed_books = heapq.nlargest(
+            10, ((book, len(book.borrowed_by)) for book in books if book.borrowed_by),
+            key=lambda x: x[1])
         
         if not borrowed_books:
             print("ℹ️ No hay historial de préstamos.")
         else:
-            for i, (book, count) in enumerate(borrowed_books[:10], 1):
-                print(f"📚 {i:2d}. {book.title} - {count} préstamos")
+            print("\n".join(f"📚 {i:2d}. {book.title} - {count} préstamos"
+                            for i, (book, count) in enumerate(borrowed_books, 1)))
         
         print()
         self.pause()
@@ -398,14 +447,15 @@ class ConsoleUI:
         self.print_header("⭐ USUARIOS MÁS ACTIVOS ⭐")
         
         users = self.library_service.get_all_users()
-        active_users = [(user, len(user.borrowed_books)) for user in users if user.borrowed_books]
-        active_users.sort(key=lambda x: x[1], reverse=True)
+        active_users = sorted(
+            ((user, len(user.borrowed_books)) for user in users if user.borrowed_books),
+            key=lambda x: x[1], reverse=True)
         
         if not active_users:
             print("ℹ️ No hay usuarios con préstamos activos.")
         else:
-            for i, (user, count) in enumerate(active_users, 1):
-                print(f"👤 {i:2d}. {user.name} - {count} libros prestados")
+            print("\n".join(f"👤 {i:2d}. {user.name} - {count} libros prestados"
+                            for i, (user, count) in enumerate(active_users, 1)))
         
         print()
         self.pause()
@@ -414,28 +464,23 @@ class ConsoleUI:
         self.clear_screen()
         self.print_header("📈 ESTADÍSTICAS GENERALES 📈")
         
-        books = self.library_service.get_all_books()
-        users = self.library_service.get_all_users()
-        
-        total_books = len(books)
-        total_copies = sum(book.total_copies for book in books)
-        available_copies = sum(book.available_copies for book in books)
-        borrowed_copies = total_copies - available_copies
-        total_users = len(users)
-        active_users = len([user for user in users if user.borrowed_books])
+        # Contadores incrementales del servicio: sin recorrer libros ni usuarios
+        stats = self.library_service.get_general_statistics()
         
-        print(f"📚 Total de libros únicos: {total_books}")
-        print(f"📖 Total de copias: {total_copies}")
-        print(f"✅ Copias disponibles: {available_copies}")
-        print(f"📤 Copias prestadas: {borrowed_copies}")
-        print(f"👥 Total de usuarios: {total_users}")
-        print(f"⭐ Usuarios con préstamos activos: {active_users}")
+        lines = [
+            f"📚 Total de libros únicos: {stats['total_books']}",
+            f"📖 Total de copias: {stats['total_copies']}",
+            f"✅ Copias disponibles: {stats['available_copies']}",
+            f"📤 Copias prestadas: {stats['borrowed_copies']}",
+            f"👥 Total de usuarios: {stats['total_users']}",
+            f"⭐ Usuarios con préstamos activos: {stats['active_users']}",
+        ]
         
-        if total_copies > 0:
-            utilization = (borrowed_copies / total_copies) * 100
-            print(f"📊 Tasa de utilización: {utilization:.1f}%")
+        if stats['total_copies'] > 0:
+            lines.append(f"📊 Tasa de utilización: {stats['utilization_rate']:.1f}%")
         
-        print()
+        lines.append("")
+        print("\n".join(lines))
         self.pause()
     
     def show_operation_history(self):
@@ -447,34 +492,28 @@ class ConsoleUI:
         if not history:
             print("ℹ️ No hay operaciones registradas.")
         else:
-            print("🕒 Últimas 15 operaciones (más reciente primero):\n")
+            lines = ["🕒 Últimas 15 operaciones (más reciente primero):\n"]
             for i, operation in enumerate(history, 1):
-                action_icons = {
-                    'add_book': '📚➕',
-                    'remove_book': '📚🗑️',
-                    'add_user': '👤➕',
-                    'remove_user': '👤🗑️',
-                    'borrow_book': '📤',
-                    'return_book': '📥'
-                }
-                
-                icon = action_icons.get(operation['action'], '📝')
-                timestamp = operation['timestamp'].strftime("%Y-%m-%d %H:%M:%S")
+                action = operation['action']
+                icon = _ACTION_ICONS.get(action, '📝')
+                # Mismo formato que strftime("%Y-%m-%d %H:%M:%S"), sin pasar por locale
+                timestamp = operation['timestamp'].isoformat(' ', 'seconds')
                 
-                if operation['action'] in ['add_book', 'remove_book']:
+                if action in _BOOK_ACTIONS:
                     detail = f"ISBN: {operation['isbn']}"
                     if 'title' in operation:
                         detail += f" - {operation['title']}"
-                elif operation['action'] in ['add_user', 'remove_user']:
+                elif action in _USER_ACTIONS:
                     detail = f"Usuario: {operation['user_id']}"
                     if 'name' in operation:
                         detail += f" - {operation['name']}"
-                elif operation['action'] in ['borrow_book', 'return_book']:
+                elif action in _LOAN_ACTIONS:
                     detail = f"Usuario: {operation['user_id']}, ISBN: {operation['isbn']}"
                 else:
                     detail = "Operación del sistema"
                 
-                print(f"{icon} {i:2d}. [{timestamp}] {detail}")
+                lines.append(f"{icon} {i:2d}. [{timestamp}] {detail}")
+            print("\n".join(lines))
         
         print()
         self.pause()
@@ -488,9 +527,10 @@ class ConsoleUI:
         if not notifications:
             print("ℹ️ No hay notificaciones pendientes.")
         else:
-            print("📢 Notificaciones recientes:\n")
-            for i, notification in enumerate(notifications, 1):
-                print(f"🔔 {i:2d}. {notification}")
+            lines = ["📢 Notificaciones recientes:\n"]
+            lines.extend(f"🔔 {i:2d}. {notification}"
+                         for i, notification in enumerate(notifications, 1))
+            print("\n".join(lines))
         
         print()
         self.pause()
@@ -502,14 +542,9 @@ class ConsoleUI:
         while True:
             option = self.show_main_menu()
             
-            if option == "1":
-                self.show_books_menu()
-            elif option == "2":
-                self.show_users_menu()
-            elif option == "3":
-                self.show_loans_menu()
-            elif option == "4":
-                self.show_reports_menu()
+            action = self._main_actions.get(option)
+            if action:
+                action()
             elif option == "5":
                 print("\n👋 ¡Gracias por usar el Sistema de Gestión de Biblioteca! 📚")
                 break
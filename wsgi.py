@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Punto de Entrada WSGI para Producción
+=====================================
+
+Expone la aplicación Flask para servidores WSGI de producción:
+
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app
+
+El estado de la biblioteca vive en memoria dentro del proceso, por lo que se
+usa un único worker con varios hilos: varios procesos tendrían cada uno su
+propia copia de los datos y divergirían tras la primera modificación.
+"""
+
+import os
+
+from src.api.routes import app
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000, threaded=True,
+            debug=os.environ.get('FLASK_DEBUG') == '1')